@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 from enum import Enum
 from typing import Optional
 
@@ -57,6 +58,15 @@ class ParsedReport(BaseModel):
     warnings: list[str] = Field(default_factory=list)
     secondary_test_types: list[str] = Field(default_factory=list)
 
+    @functools.cached_property
+    def abbreviation_index(self) -> dict[str, ParsedMeasurement]:
+        """Measurements keyed by abbreviation, built on first access.
+
+        Read only once ``measurements`` is final (after secondary merges and
+        LLM fallback extraction), as later list changes are not reflected.
+        """
+        return {m.abbreviation: m for m in self.measurements}
+
 
 class CompoundSegmentInfo(BaseModel):
     start_page: int
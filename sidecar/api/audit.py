@@ -7,8 +7,7 @@ Output goes to stdout (captured by CloudWatch in production via ECS).
 import logging
 import time
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger("audit")
 logger.setLevel(logging.INFO)
@@ -22,26 +21,32 @@ if not logger.handlers:
     logger.addHandler(handler)
 
 
-class AuditMiddleware(BaseHTTPMiddleware):
+class AuditMiddleware:
     """Log every authenticated request for compliance and debugging."""
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
-        response = await call_next(request)
-        duration_ms = round((time.time() - start_time) * 1000, 1)
-
-        user_id = getattr(request.state, "user_id", None) or "anonymous"
-        method = request.method
-        path = request.url.path
-        status_code = response.status_code
-
-        logger.info(
-            "user=%s method=%s path=%s status=%d duration_ms=%.1f",
-            user_id,
-            method,
-            path,
-            status_code,
-            duration_ms,
-        )
-
-        return response
+
+        async def send_wrapper(message: Message) -> None:
+            # Logged when the response starts, as soon as the status is known.
+            if message["type"] == "http.response.start":
+                duration_ms = round((time.time() - start_time) * 1000, 1)
+                user_id = scope.get("state", {}).get("user_id") or "anonymous"
+                logger.info(
+                    "user=%s method=%s path=%s status=%d duration_ms=%.1f",
+                    user_id,
+                    scope["method"],
+                    scope["path"],
+                    message["status"],
+                    duration_ms,
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
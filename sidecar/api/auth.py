@@ -9,9 +9,9 @@ import os
 
 import jwt
 from jwt import PyJWKClient
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 _logger = logging.getLogger(__name__)
 
@@ -153,46 +153,89 @@ def _decode_token(token: str) -> dict:
     )
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+async def _call_app(app: ASGIApp, scope: Scope, receive: Receive, send: Send) -> None:
+    """Run the downstream app, turning an unhandled error into a JSON 500.
+
+    The 500 is only sent if the app failed before starting its response;
+    otherwise the error is re-raised for the server to close the connection.
+    """
+    response_started = False
+
+    async def send_wrapper(message: Message) -> None:
+        nonlocal response_started
+        if message["type"] == "http.response.start":
+            response_started = True
+        await send(message)
+
+    try:
+        await app(scope, receive, send_wrapper)
+    except Exception:
+        _logger.exception("Unhandled error on %s %s", scope["method"], scope["path"])
+        if response_started:
+            raise
+        response = JSONResponse({"detail": "Internal server error"}, status_code=500)
+        await response(scope, receive, send)
+
+
+class AuthMiddleware:
+    """Verify the Cognito JWT and attach user_id to request state.
+
+    Written as plain ASGI rather than BaseHTTPMiddleware so responses,
+    including the SSE explain streams, pass straight through without an
+    extra task and memory stream per request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
         # Skip auth entirely in desktop mode
         if not REQUIRE_AUTH:
             request.state.user_id = None
-            try:
-                return await call_next(request)
-            except Exception as exc:
-                _logger.exception("Unhandled error on %s %s", request.method, request.url.path)
-                return JSONResponse(
-                    {"detail": "Internal server error"},
-                    status_code=500,
-                )
+            await _call_app(self.app, scope, receive, send)
+            return
 
         # Skip auth for health check, CORS preflight, and Stripe webhook
-        if request.url.path in ("/health", "/billing/webhook") or request.method == "OPTIONS":
+        if scope["path"] in ("/health", "/billing/webhook") or scope["method"] == "OPTIONS":
             request.state.user_id = None
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Extract and verify JWT
         auth_header = request.headers.get("authorization", "")
         if not auth_header.startswith("Bearer "):
-            return JSONResponse(
+            response = JSONResponse(
                 {"detail": "Missing authorization header"}, status_code=401
             )
+            await response(scope, receive, send)
+            return
 
         token = auth_header[7:]
         try:
             payload = _decode_token(token)
             request.state.user_id = payload.get("sub")
             if not request.state.user_id:
-                return JSONResponse(
+                response = JSONResponse(
                     {"detail": "Invalid token: missing sub"}, status_code=401
                 )
+                await response(scope, receive, send)
+                return
         except jwt.ExpiredSignatureError:
-            return JSONResponse({"detail": "Token expired"}, status_code=401)
+            response = JSONResponse({"detail": "Token expired"}, status_code=401)
+            await response(scope, receive, send)
+            return
         except jwt.InvalidTokenError as e:
-            return JSONResponse(
+            response = JSONResponse(
                 {"detail": "Invalid token"}, status_code=401
             )
+            await response(scope, receive, send)
+            return
 
         # Auto-provision user in the database on first request
         try:
@@ -206,11 +249,4 @@ class AuthMiddleware(BaseHTTPMiddleware):
         # Attach practice context to request state
         await _attach_practice_context(request)
 
-        try:
-            return await call_next(request)
-        except Exception as exc:
-            _logger.exception("Unhandled error on %s %s", request.method, request.url.path)
-            return JSONResponse(
-                {"detail": "Internal server error"},
-                status_code=500,
-            )
+        await _call_app(self.app, scope, receive, send)
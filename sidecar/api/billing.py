@@ -11,8 +11,8 @@ from datetime import datetime, timezone
 
 import stripe
 from fastapi import APIRouter, HTTPException, Request
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
@@ -341,103 +341,122 @@ async def _is_admin_user(user_id: str) -> bool:
 # ---------------------------------------------------------------------------
 
 
-class BillingMiddleware(BaseHTTPMiddleware):
+class BillingMiddleware:
     """Enforce subscription limits on metered endpoints.
 
     Only active when REQUIRE_AUTH=true (web mode).
     """
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        try:
+            response = await self._check_limits(request)
+        except Exception:
+            logger.exception(
+                "Billing middleware error for user %s",
+                getattr(request.state, "user_id", None),
+            )
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Billing system temporarily unavailable. Please try again shortly."},
+            )
+
+        if response is not None:
+            await response(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _check_limits(self, request: Request) -> JSONResponse | None:
+        """Return a 402 response if the request is over its limit, else None."""
         # Skip for non-metered paths and OPTIONS
         path = request.url.path
         if request.method == "OPTIONS" or any(path.startswith(p) for p in _SKIP_PREFIXES):
-            return await call_next(request)
+            return None
 
         # Only meter paths in the feature map
         counter = _FEATURE_MAP.get(path)
         if not counter:
-            return await call_next(request)
+            return None
 
         user_id = getattr(request.state, "user_id", None)
         if not user_id:
-            return await call_next(request)
+            return None
 
-        try:
-            # Check if payments are enabled
-            if not await is_payments_enabled():
-                return await call_next(request)
-
-            # Check user-level override
-            override = await check_billing_override(user_id)
-            if override and override.get("payments_exempt"):
-                return await call_next(request)
-
-            # Get subscription
-            sub = await get_subscription_status(user_id)
-            if not sub:
-                return JSONResponse(
-                    status_code=402,
-                    content={
-                        "detail": "No active subscription. Start a free trial or subscribe to continue.",
-                        "tier": None,
-                        "feature": _FEATURE_DISPLAY.get(counter, counter),
-                        "limit": 0,
-                        "used": 0,
-                        "upgrade_url": "/billing",
-                    },
-                )
-
-            # Get tier (use override custom_tier if set)
-            tier = sub["tier"]
-            if override and override.get("custom_tier"):
-                tier = override["custom_tier"]
-
-            # Get limits for the tier
-            limits = await get_tier_limits(tier)
-            if not limits:
-                return await call_next(request)
-
-            # Check the specific limit
-            limit_key = _LIMIT_MAP.get(counter)
-            if not limit_key:
-                return await call_next(request)
-
-            max_allowed = limits.get(limit_key)
-            if max_allowed is None:
-                # NULL = unlimited
-                await increment_usage(user_id, counter)
-                return await call_next(request)
-
-            # Get current usage
-            period_start = sub.get("current_period_start") or datetime.now(timezone.utc).replace(day=1)
-            period_end = sub.get("current_period_end") or datetime.now(timezone.utc)
-            usage = await get_current_usage(user_id, period_start, period_end)
-            current_count = usage.get(counter, 0)
-
-            if current_count >= max_allowed:
-                return JSONResponse(
-                    status_code=402,
-                    content={
-                        "detail": "Usage limit reached",
-                        "tier": tier,
-                        "feature": _FEATURE_DISPLAY.get(counter, counter),
-                        "limit": max_allowed,
-                        "used": current_count,
-                        "upgrade_url": "/billing",
-                    },
-                )
-
-            # Within limits — increment and proceed
+        # Check if payments are enabled
+        if not await is_payments_enabled():
+            return None
+
+        # Check user-level override
+        override = await check_billing_override(user_id)
+        if override and override.get("payments_exempt"):
+            return None
+
+        # Get subscription
+        sub = await get_subscription_status(user_id)
+        if not sub:
+            return JSONResponse(
+                status_code=402,
+                content={
+                    "detail": "No active subscription. Start a free trial or subscribe to continue.",
+                    "tier": None,
+                    "feature": _FEATURE_DISPLAY.get(counter, counter),
+                    "limit": 0,
+                    "used": 0,
+                    "upgrade_url": "/billing",
+                },
+            )
+
+        # Get tier (use override custom_tier if set)
+        tier = sub["tier"]
+        if override and override.get("custom_tier"):
+            tier = override["custom_tier"]
+
+        # Get limits for the tier
+        limits = await get_tier_limits(tier)
+        if not limits:
+            return None
+
+        # Check the specific limit
+        limit_key = _LIMIT_MAP.get(counter)
+        if not limit_key:
+            return None
+
+        max_allowed = limits.get(limit_key)
+        if max_allowed is None:
+            # NULL = unlimited
             await increment_usage(user_id, counter)
-            return await call_next(request)
+            return None
 
-        except Exception:
-            logger.exception("Billing middleware error for user %s", user_id)
+        # Get current usage
+        period_start = sub.get("current_period_start") or datetime.now(timezone.utc).replace(day=1)
+        period_end = sub.get("current_period_end") or datetime.now(timezone.utc)
+        usage = await get_current_usage(user_id, period_start, period_end)
+        current_count = usage.get(counter, 0)
+
+        if current_count >= max_allowed:
             return JSONResponse(
-                status_code=503,
-                content={"detail": "Billing system temporarily unavailable. Please try again shortly."},
+                status_code=402,
+                content={
+                    "detail": "Usage limit reached",
+                    "tier": tier,
+                    "feature": _FEATURE_DISPLAY.get(counter, counter),
+                    "limit": max_allowed,
+                    "used": current_count,
+                    "upgrade_url": "/billing",
+                },
             )
 
+        # Within limits — increment and proceed
+        await increment_usage(user_id, counter)
+        return None
+
 
 # ---------------------------------------------------------------------------
 # Billing API Router
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import os
@@ -55,7 +56,7 @@ from llm.prompt_engine import LiteracyLevel, PromptEngine
 from llm.response_parser import parse_and_validate_response
 from llm.retry import LLMRetryError, with_retry
 from llm.schemas import EXPLANATION_TOOL_NAME, EXPLANATION_TOOL_SCHEMA
-from phi.scrubber import scrub_phi
+from phi.scrubber import scrub_phi, scrub_phi_async
 from test_types import registry
 from api.rate_limit import limiter, ANALYZE_RATE_LIMIT
 
@@ -312,7 +313,7 @@ async def scrub_preview(request: Request, body: dict = Body(...)):
     settings = await settings_store.get_settings(user_id=user_id)
     providers = list(settings.practice_providers) if settings.practice_providers else None
 
-    scrub_result = scrub_phi(full_text, provider_names=providers)
+    scrub_result = await scrub_phi_async(full_text, providers)
     scrubbed_clinical = scrub_phi(clinical_context, provider_names=providers).scrubbed_text if clinical_context else ""
 
     return {
@@ -564,7 +565,7 @@ async def detect_test_type(request: Request, body: DetectTypeRequest = Body(...)
 
             # Scrub PHI before sending text to LLM for type detection
             _det_providers = list(settings.practice_providers) if settings.practice_providers else None
-            _det_scrubbed = scrub_phi(extraction_result.full_text, provider_names=_det_providers).scrubbed_text
+            _det_scrubbed = (await scrub_phi_async(extraction_result.full_text, _det_providers)).scrubbed_text
 
             _det_user_hint = scrub_phi(body.user_hint, provider_names=_det_providers).scrubbed_text if body.user_hint else None
             llm_type_id, llm_confidence, llm_display = await llm_detect_test_type(
@@ -1018,7 +1019,7 @@ async def explain_report(request: Request, body: ExplainRequest = Body(...)):
 
     # 5. PHI scrub (before any LLM calls)
     providers = list(settings.practice_providers) if settings.practice_providers else None
-    scrub_result = scrub_phi(extraction_result.full_text, provider_names=providers)
+    scrub_result = await scrub_phi_async(extraction_result.full_text, providers)
 
     # 5a. LLM measurement extraction for generic types without extractors
     inc_measurements_check = body.include_measurements if body.include_measurements is not None else True
@@ -1381,12 +1382,15 @@ async def explain_report(request: Request, body: ExplainRequest = Body(...)):
             detail="LLM API call failed.",
         )
 
-    # 8. Parse and validate response
+    # 8. Parse and validate response. The humanization rewrites are pure
+    #    CPU work over every field, so run them off the event loop.
     try:
-        explanation, issues = parse_and_validate_response(
-            tool_result=llm_response.tool_call_result,
-            parsed_report=parsed_report,
-            humanization_level=humanization_level,
+        explanation, issues = await asyncio.get_event_loop().run_in_executor(
+            None,
+            parse_and_validate_response,
+            llm_response.tool_call_result,
+            parsed_report,
+            humanization_level,
         )
     except ValueError as e:
         raise HTTPException(
@@ -1578,7 +1582,7 @@ async def _explain_stream_gen(explain_request: ExplainRequest, user_id: str | No
 
         # PHI scrub before any LLM calls
         providers = list(settings.practice_providers) if settings.practice_providers else None
-        scrub_result = scrub_phi(extraction_result.full_text, provider_names=providers)
+        scrub_result = await scrub_phi_async(extraction_result.full_text, providers)
 
         # LLM measurement extraction for generic types without extractors
         inc_measurements_check = explain_request.include_measurements if explain_request.include_measurements is not None else True
@@ -1919,10 +1923,12 @@ async def _explain_stream_gen(explain_request: ExplainRequest, user_id: str | No
         yield _sse_event({"stage": "validating", "message": "Checking response quality..."})
 
         try:
-            explanation, issues = parse_and_validate_response(
-                tool_result=llm_response.tool_call_result,
-                parsed_report=parsed_report,
-                humanization_level=humanization_level,
+            explanation, issues = await asyncio.get_event_loop().run_in_executor(
+                None,
+                parse_and_validate_response,
+                llm_response.tool_call_result,
+                parsed_report,
+                humanization_level,
             )
         except ValueError as e:
             yield _sse_event({"stage": "error", "message": "LLM response validation failed. Please try again."})
@@ -2025,7 +2031,7 @@ async def interpret_report(request: Request, body: InterpretRequest = Body(...))
 
     # PHI scrub
     providers = list(settings.practice_providers) if settings.practice_providers else None
-    scrub_result = scrub_phi(extraction_result.full_text, provider_names=providers)
+    scrub_result = await scrub_phi_async(extraction_result.full_text, providers)
     provider_str = settings.llm_provider.value
     api_key = settings_store.get_api_key_for_provider(provider_str)
     if not api_key:
@@ -35,15 +35,16 @@ async def _get_all_db_settings(user_id: str | None = None) -> dict[str, str]:
         return get_db().get_all_settings()
 
 
-async def _set_setting(key: str, value: str, user_id: str | None = None) -> None:
-    """Set a setting in the appropriate database."""
+async def _set_settings(values: dict[str, str], user_id: str | None = None) -> None:
+    """Set several settings at once (one transaction in SQLite)."""
     if _USE_PG:
         from storage.pg_database import get_pg_db
         db = get_pg_db()
-        await db.set_setting(key, value, user_id=user_id)
+        for key, value in values.items():
+            await db.set_setting(key, value, user_id=user_id)
     else:
         from storage.database import get_db
-        get_db().set_setting(key, value)
+        get_db().set_settings(values)
 
 
 async def _delete_setting(key: str, user_id: str | None = None) -> None:
@@ -184,20 +185,22 @@ async def update_settings(update: SettingsUpdate, user_id: str | None = None) ->
             update_data.pop(secret_key, None)
 
     # Persist non-secret settings in DB
+    to_set: dict[str, str] = {}
     for key in _DB_KEYS:
         if key in update_data:
             val = update_data[key]
             if key == "short_comment_char_limit":
-                await _set_setting(key, "none" if val is None else str(val), user_id=user_id)
+                to_set[key] = "none" if val is None else str(val)
             elif val is None:
                 await _delete_setting(key, user_id=user_id)
             elif key in _JSON_LIST_KEYS:
-                await _set_setting(key, json.dumps(val), user_id=user_id)
+                to_set[key] = json.dumps(val)
             elif isinstance(val, bool):
-                await _set_setting(key, "true" if val else "false", user_id=user_id)
+                to_set[key] = "true" if val else "false"
             else:
                 # Enums -> store their value string
-                await _set_setting(key, val.value if hasattr(val, "value") else str(val), user_id=user_id)
+                to_set[key] = val.value if hasattr(val, "value") else str(val)
+    await _set_settings(to_set, user_id=user_id)
 
     return await get_settings(user_id=user_id)
 
@@ -10,11 +10,24 @@ patient-facing communications that require no editing before sending.
 
 from __future__ import annotations
 
+import functools
 import re
 from enum import Enum
+from typing import Iterator
 
 from api.analysis_models import ParsedReport
 
+_INDICATION_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"Indication[s]?:\s*(.+?)(?:\n|$)",
+        r"Reason for (?:study|exam|test|examination):\s*(.+?)(?:\n|$)",
+        r"Clinical indication[s]?:\s*(.+?)(?:\n|$)",
+        r"Reason for referral:\s*(.+?)(?:\n|$)",
+        r"Clinical history:\s*(.+?)(?:\n|$)",
+    )
+]
+
 
 def _extract_indication_from_report(report_text: str) -> str | None:
     """Extract indication/reason for study from report header.
@@ -23,15 +36,8 @@ def _extract_indication_from_report(report_text: str) -> str | None:
     line near the top. This function extracts that text so it can be used
     as clinical context when none is explicitly provided.
     """
-    patterns = [
-        r"Indication[s]?:\s*(.+?)(?:\n|$)",
-        r"Reason for (?:study|exam|test|examination):\s*(.+?)(?:\n|$)",
-        r"Clinical indication[s]?:\s*(.+?)(?:\n|$)",
-        r"Reason for referral:\s*(.+?)(?:\n|$)",
-        r"Clinical history:\s*(.+?)(?:\n|$)",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, report_text, re.IGNORECASE)
+    for pattern in _INDICATION_PATTERNS:
+        match = pattern.search(report_text)
         if match:
             indication = match.group(1).strip()
             # Skip if it's just "None" or empty
@@ -1508,6 +1514,19 @@ that help the patient understand their health.
 
 """
 
+
+# Specialty has low cardinality process-wide, so the formatted identity and
+# voice blocks are cached per specialty.
+@functools.lru_cache(maxsize=64)
+def _format_physician_identity(specialty: str) -> str:
+    return _PHYSICIAN_IDENTITY.format(specialty=specialty)
+
+
+@functools.lru_cache(maxsize=64)
+def _format_clinical_voice_rule(specialty: str) -> str:
+    return _CLINICAL_VOICE_RULE.format(specialty=specialty)
+
+
 _INTERPRETATION_STRUCTURE_PERFUSION = """\
 ## Interpretation Guidance (Nuclear Perfusion Study)
 
@@ -6607,10 +6626,18 @@ _CROSS_BLOCK_SPINE_MRI = """
 
 def _select_domain_knowledge(prompt_context: dict) -> str:
     """Select appropriate domain knowledge block based on test type/category."""
-    test_type = prompt_context.get("test_type", "")
-    category = prompt_context.get("category", "")
-    interpretation_rules = prompt_context.get("interpretation_rules", "")
+    return _domain_knowledge_for(
+        prompt_context.get("test_type", ""),
+        prompt_context.get("category", ""),
+        prompt_context.get("interpretation_rules", ""),
+    )
+
 
+@functools.lru_cache(maxsize=256)
+def _domain_knowledge_for(
+    test_type: str, category: str, interpretation_rules: str,
+) -> str:
+    """Cached body of _select_domain_knowledge, keyed on the fields it reads."""
     # Select based on test type first (most specific), then category
     if test_type in ("lab_results", "blood_lab_results"):
         domain = _CLINICAL_DOMAIN_KNOWLEDGE_LABS
@@ -6887,10 +6914,194 @@ def _build_humanization_rules(
     return "".join(sections)
 
 
+# Demographic interpretation guidance, indexed by (age bucket, sex letter).
+# Table entries are stored already bulleted for the system prompt.
+# Age buckets: 0 = <18, 1 = 18-39, 2 = 40-49, 3 = 50-64, 4 = 65-79, 5 = 80+.
+_MIDDLE_AGED_GUIDANCE = (
+    "Middle-aged adult: Cardiovascular risk factors become more relevant. "
+    "Lipid panel, A1C, and blood pressure context are important. "
+    "Mention if findings warrant lifestyle discussion."
+)
+
+_AGE_GUIDANCE = (
+    "Pediatric patient: Adult reference ranges may not apply. "
+    "Note that some values differ significantly in children. "
+    "Heart rate and blood pressure norms are age-dependent.",
+    "Young adult: Abnormal findings are less expected and may warrant "
+    "closer attention. Consider family history implications.",
+    _MIDDLE_AGED_GUIDANCE,
+    _MIDDLE_AGED_GUIDANCE,
+    "Geriatric patient (65+): Mildly abnormal values may be more "
+    "clinically significant. Pay particular attention to renal function, "
+    "electrolytes, cardiac findings, and fall risk indicators. "
+    "Diastolic dysfunction grade I is common at this age.",
+    "Very elderly patient (80+): Expect some age-related changes. "
+    "Mild LVH, diastolic dysfunction grade I, and mild valve "
+    "calcification are common. Focus on clinically actionable findings. "
+    "eGFR decline is expected; creatinine-based estimates may "
+    "underestimate true function due to reduced muscle mass.",
+)
+
+_SEX_GUIDANCE = {
+    "f": (
+        "Female patient: Use female-specific reference ranges — "
+        "hemoglobin (12.0-16.0), hematocrit (35.5-44.9%), creatinine "
+        "(0.6-1.1), ferritin (12-150), LVEF (≥54%), LVIDd (3.8-5.2 cm). "
+        "Ferritin < 30 may indicate iron deficiency even if within range. "
+        "HDL target ≥ 50. QTc prolongation threshold: > 460 ms."
+    ),
+    "m": (
+        "Male patient: Use male-specific reference ranges — "
+        "hemoglobin (13.5-17.5), hematocrit (38.3-48.6%), creatinine "
+        "(0.7-1.3), ferritin (12-300), LVEF (≥52%), LVIDd (4.2-5.8 cm). "
+        "HDL target ≥ 40. QTc prolongation threshold: > 450 ms."
+    ),
+}
+
+# Combined age+sex guidance for patients aged 50 and over (buckets 3+)
+_SEX_OVER_50_GUIDANCE = {
+    "f": (
+        "Post-menopausal female: Cardiovascular risk approaches male levels. "
+        "Bone density may be relevant if DEXA. Thyroid screening is common."
+    ),
+    "m": (
+        "Male 50+: Prostate markers (if present) need age context. "
+        "Cardiovascular risk assessment is particularly important."
+    ),
+}
+
+
+def _age_bucket(age: int | None) -> int | None:
+    if age is None:
+        return None
+    if age < 18:
+        return 0
+    if age < 40:
+        return 1
+    if age < 50:
+        return 2
+    if age < 65:
+        return 3
+    if age < 80:
+        return 4
+    return 5
+
+
+def _build_demographic_guidance_table() -> dict[tuple[int | None, str], tuple[str, ...]]:
+    table: dict[tuple[int | None, str], tuple[str, ...]] = {}
+    for bucket in (None, *range(len(_AGE_GUIDANCE))):
+        for sex in ("", "f", "m"):
+            parts: list[str] = []
+            if bucket is not None:
+                parts.append(_AGE_GUIDANCE[bucket])
+            if sex:
+                parts.append(_SEX_GUIDANCE[sex])
+                if bucket is not None and bucket >= 3:
+                    parts.append(_SEX_OVER_50_GUIDANCE[sex])
+            table[(bucket, sex)] = tuple(f"- {p}" for p in parts)
+    return table
+
+
+_DEMOGRAPHIC_GUIDANCE = _build_demographic_guidance_table()
+
+
+# Fixed blocks appended by the user-prompt builders.
+_CLINICAL_CONTEXT_INSTRUCTIONS = (
+    "\n**Instructions for using clinical context:**\n"
+    "- This is BACKGROUND INFORMATION ONLY — use it to understand the patient's history, symptoms, medications, and reason for testing\n"
+    "- Identify the chief complaint or reason for this test\n"
+    "- Prioritize findings from the IMPORTED REPORT that are relevant to the clinical question\n"
+    "- Specifically address whether the IMPORTED REPORT's results support, argue against, or are inconclusive for the suspected condition\n"
+    "- Note findings from the imported report that are particularly relevant to the patient's history or medications\n"
+    "- If medications affect interpretation (e.g., beta blockers → controlled heart rate, diuretics → electrolytes), mention this\n"
+    "- CRITICAL: If this context contains results from OTHER tests (e.g., stress test, labs, imaging), do NOT analyze or explain those results — they are background only. Your analysis must be limited to the imported report data provided in the sections above"
+)
+
+_CROSS_REFERENCE_RULE = (
+    "\n## Cross-Reference Rule\n"
+    "Before interpreting each measurement in the Parsed Measurements "
+    "section below, check the Medication Considerations, Condition "
+    "Guidance, and Chief Complaint sections above. If a medication or "
+    "condition can explain or influence a measurement, mention that "
+    "connection in your interpretation. For example:\n"
+    "- Heart rate of 52 + beta blocker detected → note that the low "
+    "rate likely reflects the medication, not a cardiac problem\n"
+    "- A1C of 7.2% + diabetes detected → interpret in the context of "
+    "diabetic management targets, not generic reference ranges\n"
+    "- Low potassium + diuretic detected → mention the medication as "
+    "a likely contributor\n"
+    "Do NOT repeat the medication/condition sections verbatim — just "
+    "weave the relevant connections into your measurement interpretations."
+)
+
+_PERSONALIZATION_PRIORITY = (
+    "\n## Personalization Priority\n"
+    "The sections below contain the physician's learned preferences. "
+    "When they conflict with each other, resolve using this priority "
+    "(highest first):\n"
+    "1. **Edit corrections & vocabulary preferences** — the physician "
+    "explicitly changed these words/phrases. Always honor them.\n"
+    "2. **Teaching points** — the physician wrote these instructions "
+    "by hand. Follow them closely.\n"
+    "3. **Quality feedback adjustments** — the physician rated output "
+    "poorly and these adjustments address that. Apply them.\n"
+    "4. **Term preferences** — explicit choices about medical vs. plain "
+    "language for specific terms.\n"
+    "5. **Style profile & liked examples** — learned passively from "
+    "approved outputs. Good defaults, but yield to explicit corrections.\n"
+    "6. **Conditional rules & editing patterns** — inferred patterns. "
+    "Use as tiebreakers, not overrides.\n\n"
+    "If a teaching point says \"always use EF percentage\" but a term "
+    "preference says \"use pumping strength\", the teaching point wins. "
+    "If an edit correction bans a phrase that a liked example used as an "
+    "opening, the edit correction wins."
+)
+
+_PREFERRED_STYLE_PREFACE = (
+    "The physician has approved outputs with the following structural characteristics.\n"
+    "Match this structure, length, and level of detail using ONLY the data\n"
+    "from the current report."
+)
+
+_TEACHING_POINTS_PREFACE = (
+    "The physician has provided the following personalized instructions.\n"
+    "These reflect their clinical style and preferences. Follow them closely\n"
+    "so the output matches how this physician communicates:"
+)
+
+_PRIOR_RESULTS_PREFACE = (
+    "When a current measurement has a corresponding prior value, "
+    "briefly note the trend (stable, improved, worsened). "
+    "Do not over-interpret small fluctuations within normal range."
+)
+
+_FINAL_INSTRUCTIONS = (
+    "\n## Instructions\n"
+    "Using ONLY the data above, write a clinical interpretation as "
+    "the physician, ready to send directly to the patient. Call the "
+    "explain_report tool with your response. Include all measurements "
+    "listed above. Do not add measurements, findings, or treatment "
+    "recommendations not present in the data."
+)
+
+_PERFUSION_ORDER_OVERRIDE = (
+    "\n**PERFUSION OVERRIDE**: This is a nuclear perfusion study. "
+    "Your FIRST paragraph must address perfusion and ischemia findings "
+    "(whether blood flow to all parts of the heart is adequate, whether "
+    "there are any perfusion defects or areas of reduced blood flow). "
+    "Do NOT mention ejection fraction, pumping function, or how "
+    "strongly/effectively the heart pumps until AFTER you have fully "
+    "discussed perfusion/ischemia findings. Ejection fraction should "
+    "appear no earlier than the third paragraph. This overrides the "
+    "general interpretation order above."
+)
+
+
 class PromptEngine:
     """Constructs system and user prompts for report explanation."""
 
     @staticmethod
+    @functools.lru_cache(maxsize=4)
     def _short_comment_sections(
         include_key_findings: bool, include_measurements: bool,
     ) -> str:
@@ -7001,77 +7212,18 @@ class PromptEngine:
         demographics_section = ""
         if patient_age is not None or patient_gender is not None:
             parts: list[str] = []
-            guidance_parts: list[str] = []
-
             if patient_age is not None:
                 parts.append(f"Age: {patient_age}")
-                if patient_age >= 80:
-                    guidance_parts.append(
-                        "Very elderly patient (80+): Expect some age-related changes. "
-                        "Mild LVH, diastolic dysfunction grade I, and mild valve "
-                        "calcification are common. Focus on clinically actionable findings. "
-                        "eGFR decline is expected; creatinine-based estimates may "
-                        "underestimate true function due to reduced muscle mass."
-                    )
-                elif patient_age >= 65:
-                    guidance_parts.append(
-                        "Geriatric patient (65+): Mildly abnormal values may be more "
-                        "clinically significant. Pay particular attention to renal function, "
-                        "electrolytes, cardiac findings, and fall risk indicators. "
-                        "Diastolic dysfunction grade I is common at this age."
-                    )
-                elif patient_age >= 40:
-                    guidance_parts.append(
-                        "Middle-aged adult: Cardiovascular risk factors become more relevant. "
-                        "Lipid panel, A1C, and blood pressure context are important. "
-                        "Mention if findings warrant lifestyle discussion."
-                    )
-                elif patient_age < 18:
-                    guidance_parts.append(
-                        "Pediatric patient: Adult reference ranges may not apply. "
-                        "Note that some values differ significantly in children. "
-                        "Heart rate and blood pressure norms are age-dependent."
-                    )
-                elif patient_age < 40:
-                    guidance_parts.append(
-                        "Young adult: Abnormal findings are less expected and may warrant "
-                        "closer attention. Consider family history implications."
-                    )
-
             if patient_gender is not None:
                 parts.append(f"Sex: {patient_gender}")
-                gender_lower = patient_gender.lower()
-                if gender_lower in ("female", "f"):
-                    guidance_parts.append(
-                        "Female patient: Use female-specific reference ranges — "
-                        "hemoglobin (12.0-16.0), hematocrit (35.5-44.9%), creatinine "
-                        "(0.6-1.1), ferritin (12-150), LVEF (≥54%), LVIDd (3.8-5.2 cm). "
-                        "Ferritin < 30 may indicate iron deficiency even if within range. "
-                        "HDL target ≥ 50. QTc prolongation threshold: > 460 ms."
-                    )
-                elif gender_lower in ("male", "m"):
-                    guidance_parts.append(
-                        "Male patient: Use male-specific reference ranges — "
-                        "hemoglobin (13.5-17.5), hematocrit (38.3-48.6%), creatinine "
-                        "(0.7-1.3), ferritin (12-300), LVEF (≥52%), LVIDd (4.2-5.8 cm). "
-                        "HDL target ≥ 40. QTc prolongation threshold: > 450 ms."
-                    )
 
-            # Combined age+sex guidance
-            if patient_age is not None and patient_gender is not None:
-                gender_lower = patient_gender.lower() if patient_gender else ""
-                if gender_lower in ("female", "f") and patient_age >= 50:
-                    guidance_parts.append(
-                        "Post-menopausal female: Cardiovascular risk approaches male levels. "
-                        "Bone density may be relevant if DEXA. Thyroid screening is common."
-                    )
-                elif gender_lower in ("male", "m") and patient_age >= 50:
-                    guidance_parts.append(
-                        "Male 50+: Prostate markers (if present) need age context. "
-                        "Cardiovascular risk assessment is particularly important."
-                    )
+            # Only the first letter distinguishes "female"/"f" from "male"/"m".
+            gender_char = patient_gender[:1].lower() if patient_gender else ""
+            if gender_char not in _SEX_GUIDANCE:
+                gender_char = ""
+            guidance_parts = _DEMOGRAPHIC_GUIDANCE[(_age_bucket(patient_age), gender_char)]
 
-            guidance_text = "\n".join(f"- {g}" for g in guidance_parts) if guidance_parts else (
+            guidance_text = "\n".join(guidance_parts) if guidance_parts else (
                 "Use age-appropriate reference ranges and clinical context "
                 "when interpreting results."
             )
@@ -7227,11 +7379,11 @@ class PromptEngine:
         specialty_voice_section = _select_specialty_voice(specialty)
 
         return (
-            f"{_PHYSICIAN_IDENTITY.format(specialty=specialty)}"
+            f"{_format_physician_identity(specialty)}"
             f"{_CONSTRAINT_HIERARCHY}"
             f"{demographics_section}"
             f"{test_type_hint_section}"
-            f"{_CLINICAL_VOICE_RULE.format(specialty=specialty)}"
+            f"{_format_clinical_voice_rule(specialty)}"
             f"{_build_no_recommendations_rule(include_lifestyle_recommendations)}"
             f"{_CLINICAL_CONTEXT_RULE}"
             f"{_INTERPRETATION_QUALITY_RULE}"
@@ -7307,8 +7459,397 @@ class PromptEngine:
                 Each dict has 'length_change_pct', 'paragraph_change', 'shorter', 'longer'.
             report_date: Optional date string extracted from the report header.
         """
+        if short_comment:
+            return self._build_short_comment_user_prompt(
+                parsed_report, reference_ranges, glossary, scrubbed_text,
+                clinical_context=clinical_context,
+                template_instructions=template_instructions,
+                closing_text=closing_text,
+                refinement_instruction=refinement_instruction,
+                liked_examples=liked_examples,
+                next_steps=next_steps,
+                teaching_points=teaching_points,
+                patient_age=patient_age,
+                patient_gender=patient_gender,
+                quick_reasons=quick_reasons,
+                custom_phrases=custom_phrases,
+                report_date=report_date,
+                no_edit_ratio=no_edit_ratio,
+                lab_reference_ranges_section=lab_reference_ranges_section,
+            )
+        return self._build_long_form_user_prompt(
+            parsed_report, reference_ranges, glossary, scrubbed_text,
+            clinical_context=clinical_context,
+            template_instructions=template_instructions,
+            closing_text=closing_text,
+            refinement_instruction=refinement_instruction,
+            liked_examples=liked_examples,
+            next_steps=next_steps,
+            teaching_points=teaching_points,
+            prior_results=prior_results,
+            recent_edits=recent_edits,
+            patient_age=patient_age,
+            patient_gender=patient_gender,
+            quick_reasons=quick_reasons,
+            custom_phrases=custom_phrases,
+            report_date=report_date,
+            no_edit_ratio=no_edit_ratio,
+            edit_corrections=edit_corrections,
+            quality_feedback=quality_feedback,
+            batch_prior_summaries=batch_prior_summaries,
+            lab_reference_ranges_section=lab_reference_ranges_section,
+            vocabulary_preferences=vocabulary_preferences,
+            style_profile=style_profile,
+            preferred_signoff=preferred_signoff,
+            term_preferences=term_preferences,
+            conditional_rules=conditional_rules,
+        )
+
+    def _build_short_comment_user_prompt(
+        self,
+        parsed_report: ParsedReport,
+        reference_ranges: dict,
+        glossary: dict[str, str],
+        scrubbed_text: str,
+        clinical_context: str | None = None,
+        template_instructions: str | None = None,
+        closing_text: str | None = None,
+        refinement_instruction: str | None = None,
+        liked_examples: list[dict] | None = None,
+        next_steps: list[str] | None = None,
+        teaching_points: list[dict] | None = None,
+        patient_age: int | None = None,
+        patient_gender: str | None = None,
+        quick_reasons: list[str] | None = None,
+        custom_phrases: list[str] | None = None,
+        report_date: str | None = None,
+        no_edit_ratio: float | None = None,
+        lab_reference_ranges_section: str | None = None,
+    ) -> str:
+        """User prompt for short comments: no learned-style personalization,
+        no prior-result trends, and a glossary limited to referenced terms."""
         sections: list[str] = []
 
+        effective_context = self._append_report_context(
+            sections, parsed_report, scrubbed_text, clinical_context,
+            quick_reasons, patient_age, patient_gender, report_date,
+            template_instructions, closing_text, next_steps,
+        )
+        self._append_style_examples(
+            sections, liked_examples, teaching_points, custom_phrases,
+        )
+        self._append_no_edit_signal(sections, no_edit_ratio)
+        self._append_measurements(
+            sections, parsed_report, reference_ranges, lab_reference_ranges_section,
+        )
+        self._append_report_findings(sections, parsed_report)
+
+        # 5. Glossary — only include terms referenced in measurements/findings
+        # Build set of abbreviations and finding keywords for filtering
+        relevant_terms: set[str] = set()
+        for m in (parsed_report.measurements or []):
+            relevant_terms.add(m.abbreviation.upper())
+            for word in m.name.split():
+                if len(word) > 3:
+                    relevant_terms.add(word.upper())
+        filtered_glossary = {
+            term: defn for term, defn in glossary.items()
+            if term.upper() in relevant_terms
+        }
+        if filtered_glossary:
+            sections.append(
+                "\n## Glossary (use these definitions when explaining terms)"
+            )
+            sections.extend([
+                f"- **{term}**: {definition}"
+                for term, definition in filtered_glossary.items()
+            ])
+
+        self._append_instructions(
+            sections, parsed_report, refinement_instruction,
+            quick_reasons, effective_context,
+        )
+        return "\n".join(sections)
+
+    def _build_long_form_user_prompt(
+        self,
+        parsed_report: ParsedReport,
+        reference_ranges: dict,
+        glossary: dict[str, str],
+        scrubbed_text: str,
+        clinical_context: str | None = None,
+        template_instructions: str | None = None,
+        closing_text: str | None = None,
+        refinement_instruction: str | None = None,
+        liked_examples: list[dict] | None = None,
+        next_steps: list[str] | None = None,
+        teaching_points: list[dict] | None = None,
+        prior_results: list[dict] | None = None,
+        recent_edits: list[dict] | None = None,
+        patient_age: int | None = None,
+        patient_gender: str | None = None,
+        quick_reasons: list[str] | None = None,
+        custom_phrases: list[str] | None = None,
+        report_date: str | None = None,
+        no_edit_ratio: float | None = None,
+        edit_corrections: dict | None = None,
+        quality_feedback: list[dict] | None = None,
+        batch_prior_summaries: list[dict] | None = None,
+        lab_reference_ranges_section: str | None = None,
+        vocabulary_preferences: dict | None = None,
+        style_profile: dict | None = None,
+        preferred_signoff: str | None = None,
+        term_preferences: list[dict] | None = None,
+        conditional_rules: list[dict] | None = None,
+    ) -> str:
+        """User prompt for full explanations, including learned physician
+        preferences, prior-result trends, and the full glossary."""
+        sections: list[str] = []
+        append = sections.append
+
+        effective_context = self._append_report_context(
+            sections, parsed_report, scrubbed_text, clinical_context,
+            quick_reasons, patient_age, patient_gender, report_date,
+            template_instructions, closing_text, next_steps,
+        )
+
+        # 1f-preamble. Personalization priority (only if any personalization active)
+        _has_personalization = any([
+            liked_examples, teaching_points, custom_phrases, recent_edits,
+            edit_corrections, vocabulary_preferences, style_profile,
+            term_preferences, conditional_rules, quality_feedback,
+        ])
+        if _has_personalization:
+            append(_PERSONALIZATION_PRIORITY)
+
+        self._append_style_examples(
+            sections, liked_examples, teaching_points, custom_phrases,
+        )
+
+        # 1h. Doctor editing patterns (learned from recent edits)
+        if recent_edits:
+            # Analyze patterns in the edits
+            shorter_count = sum(bool(e.get("shorter")) for e in recent_edits)
+            longer_count = sum(bool(e.get("longer")) for e in recent_edits)
+            avg_length_change = sum(e.get("length_change_pct", 0) for e in recent_edits) / len(recent_edits)
+            avg_para_change = sum(e.get("paragraph_change", 0) for e in recent_edits) / len(recent_edits)
+
+            guidance: list[str] = []
+            if shorter_count > longer_count and avg_length_change < -10:
+                guidance.append(
+                    f"The physician tends to shorten output by ~{abs(int(avg_length_change))}%. "
+                    f"Be more concise than the default output."
+                )
+            elif longer_count > shorter_count and avg_length_change > 10:
+                guidance.append(
+                    f"The physician tends to expand output by ~{int(avg_length_change)}%. "
+                    f"Provide more detail than the default output."
+                )
+
+            if avg_para_change < -0.5:
+                guidance.append(
+                    "The physician prefers fewer paragraphs. Combine related points."
+                )
+            elif avg_para_change > 0.5:
+                guidance.append(
+                    "The physician prefers more paragraphs for separation. "
+                    "Break up content into shorter paragraphs."
+                )
+
+            if guidance:
+                append("\n## Doctor Editing Patterns")
+                append(
+                    "Based on the physician's recent edits, adjust the output style:"
+                )
+                for g in guidance:
+                    append(f"- {g}")
+
+        self._append_no_edit_signal(sections, no_edit_ratio)
+
+        # 1h3. Word-level edit corrections (banned/preferred phrases, replacements)
+        if edit_corrections:
+            has_content = any(edit_corrections.get(k) for k in ("banned", "preferred", "replacements"))
+            if has_content:
+                append("\n## Doctor's Style Corrections")
+                append(
+                    "The physician consistently makes these word-level corrections. "
+                    "Apply them proactively:"
+                )
+                if edit_corrections.get("banned"):
+                    append("\n**Phrases to AVOID** (physician consistently removes these):")
+                    sections.extend([
+                        f'- Do NOT use: "{phrase}"'
+                        for phrase in edit_corrections["banned"][:10]
+                    ])
+                if edit_corrections.get("preferred"):
+                    append("\n**Phrases to USE** (physician consistently adds these):")
+                    sections.extend([
+                        f'- Use: "{phrase}"'
+                        for phrase in edit_corrections["preferred"][:10]
+                    ])
+                if edit_corrections.get("replacements"):
+                    append("\n**Replacements** (physician consistently changes A to B):")
+                    for old, new in edit_corrections["replacements"][:10]:
+                        append(f'- Instead of "{old}", use "{new}"')
+
+        # 1h3b. Vocabulary preferences (word-level swaps from edits)
+        if vocabulary_preferences:
+            has_vocab = vocabulary_preferences.get("preferred") or vocabulary_preferences.get("avoided")
+            if has_vocab:
+                append("\n## Physician Vocabulary Preferences")
+                append(
+                    "The physician prefers specific word choices. "
+                    "Use these preferences consistently:"
+                )
+                if vocabulary_preferences.get("avoided") and vocabulary_preferences.get("preferred"):
+                    avoided = vocabulary_preferences["avoided"]
+                    preferred = vocabulary_preferences["preferred"]
+                    for i in range(min(len(avoided), len(preferred))):
+                        append(f'- Use "{preferred[i]}" instead of "{avoided[i]}"')
+                elif vocabulary_preferences.get("preferred"):
+                    append("**Preferred words**: " + ", ".join(f'"{w}"' for w in vocabulary_preferences["preferred"]))
+
+        # 1h3c. Persistent style profile (consolidated learning)
+        if style_profile:
+            profile = style_profile.get("profile", {})
+            sample_count = style_profile.get("sample_count", 0)
+            if sample_count >= 3 and profile:
+                append(f"\n## Learned Style Profile ({sample_count} samples)")
+                if "avg_paragraph_count" in profile:
+                    append(f"- Target paragraph count: ~{profile['avg_paragraph_count']}")
+                if "avg_sentence_length" in profile:
+                    append(f"- Average sentence length: ~{profile['avg_sentence_length']} words")
+                if "contraction_rate" in profile:
+                    rate = profile["contraction_rate"]
+                    if rate > 0.02:
+                        append("- Use contractions naturally (physician style uses them)")
+                    else:
+                        append("- Avoid contractions (physician style is more formal)")
+                if profile.get("preferred_openings"):
+                    openings = profile["preferred_openings"][:3]
+                    append("- Preferred opening styles: " + "; ".join(f'"{o}"' for o in openings))
+                if profile.get("preferred_closings"):
+                    closings = profile["preferred_closings"][:3]
+                    append("- Preferred closing styles: " + "; ".join(f'"{c}"' for c in closings))
+
+        # 1h3d. Preferred sign-off
+        if preferred_signoff:
+            append("\n## Preferred Sign-off")
+            append(
+                f'The physician consistently ends communications with: "{preferred_signoff}"\n'
+                f"End the overall_summary with this or a very similar closing."
+            )
+
+        # 1h3e. Medical term preferences
+        if term_preferences:
+            plain_terms = [t for t in term_preferences if not t.get("keep_technical")]
+            tech_terms = [t for t in term_preferences if t.get("keep_technical")]
+            if plain_terms or tech_terms:
+                append("\n## Medical Term Preferences")
+                if plain_terms:
+                    append("**Use plain language for these terms:**")
+                    for t in plain_terms[:10]:
+                        append(
+                            f'- Instead of "{t["medical_term"]}", say "{t["preferred_phrasing"]}"'
+                        )
+                if tech_terms:
+                    append("**Keep these terms technical:**")
+                    for t in tech_terms[:10]:
+                        append(f'- Keep: "{t["medical_term"]}"')
+
+        # 1h3f. Context-specific conditional rules
+        if conditional_rules:
+            append("\n## Context-Specific Patterns")
+            append(
+                "The physician consistently uses these when results fall in this severity range:"
+            )
+            for rule in conditional_rules[:5]:
+                ptype = rule.get("pattern_type", "general")
+                label = ptype.replace("_", " ").title()
+                append(f'- {label}: "{rule["phrase"]}"')
+
+        # 1h4. Quality feedback adjustments (from low-rated reports)
+        if quality_feedback:
+            append("\n## Quality Feedback Adjustments")
+            append(
+                "Based on the physician's recent feedback on output quality, "
+                "make these adjustments:"
+            )
+            sections.extend([f"- {adjustment}" for adjustment in quality_feedback])
+
+        # 1h5. Cross-type batch context (summaries from other reports in this batch)
+        if batch_prior_summaries:
+            append("\n## Other Reports in This Batch")
+            append(
+                "The following reports were processed in the same batch and likely belong "
+                "to the same patient. Reference relevant cross-type findings when interpreting "
+                "this report:"
+            )
+            for summary in batch_prior_summaries:
+                label = summary.get("label", "Report")
+                test_type_display = summary.get("test_type_display", "Unknown")
+                m_summary = summary.get("measurements_summary", "")
+                append(f"\n### {label} ({test_type_display})")
+                if m_summary:
+                    append(m_summary)
+
+        # 1h6. Secondary test types detected in this report
+        if parsed_report.secondary_test_types:
+            secondary_display = ", ".join(
+                t.replace("_", " ").title() for t in parsed_report.secondary_test_types[:3]
+            )
+            append(f"\n## Multi-Type Report")
+            append(
+                f"This report also contains findings from: {secondary_display}. "
+                f"Measurements from these secondary test types have been merged into the "
+                f"parsed data below. Address all relevant findings in your interpretation."
+            )
+
+        self._append_measurements(
+            sections, parsed_report, reference_ranges, lab_reference_ranges_section,
+        )
+
+        # 2b. Prior results for trend comparison (if available)
+        if prior_results:
+            append("\n## Prior Results (for trend comparison)")
+            append(_PRIOR_RESULTS_PREFACE)
+            for prior in prior_results:
+                sections.extend(self._prior_result_rows(prior))
+
+        self._append_report_findings(sections, parsed_report)
+
+        # 5. Glossary — full glossary for long-form
+        append(
+            "\n## Glossary (use these definitions when explaining terms)"
+        )
+        sections.extend([
+            f"- **{term}**: {definition}"
+            for term, definition in glossary.items()
+        ])
+
+        self._append_instructions(
+            sections, parsed_report, refinement_instruction,
+            quick_reasons, effective_context,
+        )
+        return "\n".join(sections)
+
+    @staticmethod
+    def _append_report_context(
+        sections: list[str],
+        parsed_report: ParsedReport,
+        scrubbed_text: str,
+        clinical_context: str | None,
+        quick_reasons: list[str] | None,
+        patient_age: int | None,
+        patient_gender: str | None,
+        report_date: str | None,
+        template_instructions: str | None,
+        closing_text: str | None,
+        next_steps: list[str] | None,
+    ) -> str | None:
+        """Append report text, clinical context, demographics, template
+        structure, and next steps. Returns the effective clinical context."""
+        append = sections.append
         # 1. Report text (scrubbed) — normally skipped because the structured
         #    parsed data is sufficient. However, for unknown test types (no
         #    handler), the parsed report is empty, so include the raw text so
@@ -7316,13 +7857,14 @@ class PromptEngine:
         #    Also always include raw text for hand-drawn/OCR-heavy report types
         #    (e.g. coronary diagrams) where regex extraction is incomplete.
         _ALWAYS_INCLUDE_RAW_TEXT_TYPES = {"coronary_diagram"}
-        has_structured_data = bool(
+        # Measurements are the most commonly populated, so test them first.
+        has_structured_data = (
             parsed_report.measurements or parsed_report.sections or parsed_report.findings
         )
         force_raw = parsed_report.test_type in _ALWAYS_INCLUDE_RAW_TEXT_TYPES
         if (not has_structured_data or force_raw) and scrubbed_text:
-            sections.append("## Full Report Text (PHI Scrubbed)")
-            sections.append(scrubbed_text)
+            append("## Full Report Text (PHI Scrubbed)")
+            append(scrubbed_text)
 
         # 1b. Clinical context (if provided, or extracted from report indication)
         effective_context = clinical_context
@@ -7333,18 +7875,9 @@ class PromptEngine:
                 effective_context = f"Indication for test: {indication}"
 
         if effective_context:
-            sections.append("\n## Clinical Context")
-            sections.append(f"{effective_context}")
-            sections.append(
-                "\n**Instructions for using clinical context:**\n"
-                "- This is BACKGROUND INFORMATION ONLY — use it to understand the patient's history, symptoms, medications, and reason for testing\n"
-                "- Identify the chief complaint or reason for this test\n"
-                "- Prioritize findings from the IMPORTED REPORT that are relevant to the clinical question\n"
-                "- Specifically address whether the IMPORTED REPORT's results support, argue against, or are inconclusive for the suspected condition\n"
-                "- Note findings from the imported report that are particularly relevant to the patient's history or medications\n"
-                "- If medications affect interpretation (e.g., beta blockers → controlled heart rate, diuretics → electrolytes), mention this\n"
-                "- CRITICAL: If this context contains results from OTHER tests (e.g., stress test, labs, imaging), do NOT analyze or explain those results — they are background only. Your analysis must be limited to the imported report data provided in the sections above"
-            )
+            append("\n## Clinical Context")
+            append(f"{effective_context}")
+            append(_CLINICAL_CONTEXT_INSTRUCTIONS)
 
             # Extract and add medication-specific guidance
             has_clinical_intelligence = False
@@ -7352,7 +7885,7 @@ class PromptEngine:
             if detected_meds:
                 med_guidance = _build_medication_guidance(detected_meds)
                 if med_guidance:
-                    sections.append(med_guidance)
+                    append(med_guidance)
                     has_clinical_intelligence = True
 
             # Extract and add chronic condition guidance
@@ -7360,7 +7893,7 @@ class PromptEngine:
             if detected_conditions:
                 condition_guidance = _build_condition_guidance(detected_conditions)
                 if condition_guidance:
-                    sections.append(condition_guidance)
+                    append(condition_guidance)
                     has_clinical_intelligence = True
 
             # Extract chief complaint and symptoms for correlation
@@ -7369,7 +7902,7 @@ class PromptEngine:
             if chief_complaint or detected_symptoms:
                 cc_guidance = _build_chief_complaint_guidance(chief_complaint, detected_symptoms)
                 if cc_guidance:
-                    sections.append(cc_guidance)
+                    append(cc_guidance)
                     has_clinical_intelligence = True
 
             # Detect relevant lab patterns
@@ -7380,14 +7913,14 @@ class PromptEngine:
             if detected_patterns:
                 pattern_guidance = _build_lab_pattern_guidance(detected_patterns)
                 if pattern_guidance:
-                    sections.append(pattern_guidance)
+                    append(pattern_guidance)
                     has_clinical_intelligence = True
 
             # Extract referenced prior studies (e.g. "Echo 1/2025 showed EF 55%")
             prior_studies = _extract_prior_studies(effective_context)
             if prior_studies:
-                sections.append("\n## Referenced Prior Studies (from Clinical Context)")
-                sections.append(
+                append("\n## Referenced Prior Studies (from Clinical Context)")
+                append(
                     "The clinical context references these prior studies. When interpreting "
                     "the current report, note relevant trends or changes compared to these "
                     "prior findings where applicable. Do NOT re-explain the prior study — "
@@ -7397,39 +7930,23 @@ class PromptEngine:
                     line = f"- **{study['type']}** ({study['date']})"
                     if study.get("findings"):
                         line += f": {study['findings']}"
-                    sections.append(line)
+                    append(line)
                 has_clinical_intelligence = True
 
             # Cross-reference rule: tell the LLM to connect the clinical
             # intelligence above with the parsed measurements below
             if has_clinical_intelligence:
-                sections.append(
-                    "\n## Cross-Reference Rule\n"
-                    "Before interpreting each measurement in the Parsed Measurements "
-                    "section below, check the Medication Considerations, Condition "
-                    "Guidance, and Chief Complaint sections above. If a medication or "
-                    "condition can explain or influence a measurement, mention that "
-                    "connection in your interpretation. For example:\n"
-                    "- Heart rate of 52 + beta blocker detected → note that the low "
-                    "rate likely reflects the medication, not a cardiac problem\n"
-                    "- A1C of 7.2% + diabetes detected → interpret in the context of "
-                    "diabetic management targets, not generic reference ranges\n"
-                    "- Low potassium + diuretic detected → mention the medication as "
-                    "a likely contributor\n"
-                    "Do NOT repeat the medication/condition sections verbatim — just "
-                    "weave the relevant connections into your measurement interpretations."
-                )
+                append(_CROSS_REFERENCE_RULE)
 
         # 1c. Quick reasons (structured clinical indicators from settings)
         if quick_reasons:
-            sections.append("\n## Primary Clinical Indications")
-            sections.append(
+            append("\n## Primary Clinical Indications")
+            append(
                 "The physician selected the following primary reasons for this test. "
                 "These are the KEY clinical questions that MUST be addressed in the interpretation:\n"
             )
-            for reason in quick_reasons:
-                sections.append(f"- **{reason}**")
-            sections.append(
+            sections.extend([f"- **{reason}**" for reason in quick_reasons])
+            append(
                 "\n**Priority:** Address each of these indications explicitly. "
                 "State whether findings support, argue against, or are inconclusive for each concern. "
                 "If a finding is particularly relevant to one of these indications, highlight that connection."
@@ -7445,8 +7962,8 @@ class PromptEngine:
             demo_parts.append(f"Study/Report Date: {report_date}")
 
         if demo_parts:
-            sections.append("\n## Patient Demographics")
-            sections.append(", ".join(demo_parts))
+            append("\n## Patient Demographics")
+            append(", ".join(demo_parts))
             guidance = []
             if patient_age is not None or patient_gender is not None:
                 guidance.append(
@@ -7461,13 +7978,13 @@ class PromptEngine:
                     "'Based on your test results from March 15, 2023...'. "
                     "Do NOT ignore the year — it provides important temporal context."
                 )
-            sections.append(" ".join(guidance))
+            append(" ".join(guidance))
 
         # 1d. Template instructions — placed early so the LLM sees structural
         #     requirements before the main content sections.
         if template_instructions:
-            sections.append("\n## Structure Instructions (PHYSICIAN OVERRIDE)")
-            sections.append(
+            append("\n## Structure Instructions (PHYSICIAN OVERRIDE)")
+            append(
                 "IMPORTANT: The physician has configured specific structural "
                 "requirements via this template. These instructions MUST take "
                 "precedence over ALL default formatting, including Specialty Voice "
@@ -7476,65 +7993,44 @@ class PromptEngine:
                 "says otherwise.\n\n"
                 "Physician's structural requirements:"
             )
-            sections.append(template_instructions)
+            append(template_instructions)
         if closing_text:
-            sections.append("\n## Closing Text")
-            sections.append(
+            append("\n## Closing Text")
+            append(
                 f"End the overall_summary with the following closing text:\n{closing_text}"
             )
 
         # 1e. Next steps to include (if provided)
-        if next_steps and any(s != "No comment" for s in next_steps):
-            sections.append("\n## Specific Next Steps to Include")
-            sections.append(
+        steps_to_include = [
+            step for step in (next_steps or ())
+            if step != "No comment"
+        ]
+        if steps_to_include:
+            append("\n## Specific Next Steps to Include")
+            append(
                 "Include ONLY these exact next steps as stated. Do not expand, "
                 "embellish, or add additional recommendations:"
             )
-            for step in next_steps:
-                if step != "No comment":
-                    sections.append(f"- {step}")
+            sections.extend([f"- {step}" for step in steps_to_include])
 
-        # 1f-preamble. Personalization priority (only if any personalization active)
-        _has_personalization = any([
-            liked_examples, teaching_points, custom_phrases, recent_edits,
-            edit_corrections, vocabulary_preferences, style_profile,
-            term_preferences, conditional_rules, quality_feedback,
-        ])
-        if _has_personalization and not short_comment:
-            sections.append(
-                "\n## Personalization Priority\n"
-                "The sections below contain the physician's learned preferences. "
-                "When they conflict with each other, resolve using this priority "
-                "(highest first):\n"
-                "1. **Edit corrections & vocabulary preferences** — the physician "
-                "explicitly changed these words/phrases. Always honor them.\n"
-                "2. **Teaching points** — the physician wrote these instructions "
-                "by hand. Follow them closely.\n"
-                "3. **Quality feedback adjustments** — the physician rated output "
-                "poorly and these adjustments address that. Apply them.\n"
-                "4. **Term preferences** — explicit choices about medical vs. plain "
-                "language for specific terms.\n"
-                "5. **Style profile & liked examples** — learned passively from "
-                "approved outputs. Good defaults, but yield to explicit corrections.\n"
-                "6. **Conditional rules & editing patterns** — inferred patterns. "
-                "Use as tiebreakers, not overrides.\n\n"
-                "If a teaching point says \"always use EF percentage\" but a term "
-                "preference says \"use pumping strength\", the teaching point wins. "
-                "If an edit correction bans a phrase that a liked example used as an "
-                "opening, the edit correction wins."
-            )
+        return effective_context
 
+    @staticmethod
+    def _append_style_examples(
+        sections: list[str],
+        liked_examples: list[dict] | None,
+        teaching_points: list[dict] | None,
+        custom_phrases: list[str] | None,
+    ) -> None:
+        """Append liked-example style targets, teaching points, and custom phrases."""
+        append = sections.append
         # 1f. Preferred output style from liked/copied examples
         # NOTE: We only inject structural metadata (length, paragraph count, etc.)
         # — never prior clinical content — to avoid priming the LLM with
         # diagnoses from unrelated patients.
         if liked_examples:
-            sections.append("\n## Preferred Output Style")
-            sections.append(
-                "The physician has approved outputs with the following structural characteristics.\n"
-                "Match this structure, length, and level of detail using ONLY the data\n"
-                "from the current report."
-            )
+            append("\n## Preferred Output Style")
+            append(_PREFERRED_STYLE_PREFACE)
 
             # Collect stylistic patterns from all examples
             all_openings: list[str] = []
@@ -7543,18 +8039,13 @@ class PromptEngine:
             all_softening: list[str] = []
 
             for idx, example in enumerate(liked_examples, 1):
-                sections.append(f"\n### Style Reference {idx}")
-                sections.append(
-                    f"- Summary length: ~{example.get('approx_char_length', 'unknown')} characters"
-                )
-                sections.append(
-                    f"- Paragraphs: {example.get('paragraph_count', 'unknown')}"
-                )
-                sections.append(
-                    f"- Approximate sentences: {example.get('approx_sentence_count', 'unknown')}"
+                append(
+                    f"\n### Style Reference {idx}\n"
+                    f"- Summary length: ~{example.get('approx_char_length', 'unknown')} characters\n"
+                    f"- Paragraphs: {example.get('paragraph_count', 'unknown')}\n"
+                    f"- Approximate sentences: {example.get('approx_sentence_count', 'unknown')}\n"
+                    f"- Number of key findings reported: {example.get('num_key_findings', 0)}"
                 )
-                num_findings = example.get("num_key_findings", 0)
-                sections.append(f"- Number of key findings reported: {num_findings}")
 
                 # Collect stylistic patterns
                 patterns = example.get("stylistic_patterns", {})
@@ -7566,27 +8057,27 @@ class PromptEngine:
 
             # Add learned terminology patterns if any were found
             if any([all_openings, all_transitions, all_closings, all_softening]):
-                sections.append("\n### Practice Terminology Preferences")
-                sections.append(
+                append("\n### Practice Terminology Preferences")
+                append(
                     "The physician prefers these communication patterns. "
                     "Use similar phrasing where appropriate:"
                 )
                 if all_openings:
                     unique = list(dict.fromkeys(all_openings))[:3]
                     quoted = [f'"{p}"' for p in unique]
-                    sections.append(f"- Opening phrases: {', '.join(quoted)}")
+                    append(f"- Opening phrases: {', '.join(quoted)}")
                 if all_transitions:
                     unique = list(dict.fromkeys(all_transitions))[:4]
                     quoted = [f'"{p}"' for p in unique]
-                    sections.append(f"- Transition phrases: {', '.join(quoted)}")
+                    append(f"- Transition phrases: {', '.join(quoted)}")
                 if all_softening:
                     unique = list(dict.fromkeys(all_softening))[:3]
                     quoted = [f'"{p}"' for p in unique]
-                    sections.append(f"- Softening language: {', '.join(quoted)}")
+                    append(f"- Softening language: {', '.join(quoted)}")
                 if all_closings:
                     unique = list(dict.fromkeys(all_closings))[:2]
                     quoted = [f'"{p}"' for p in unique]
-                    sections.append(f"- Closing phrases: {', '.join(quoted)}")
+                    append(f"- Closing phrases: {', '.join(quoted)}")
 
             # Add quantitative style metrics from liked examples
             all_avg_lengths = []
@@ -7602,96 +8093,57 @@ class PromptEngine:
                     all_fragment_counts.append(patterns["fragment_count"])
 
             if any([all_avg_lengths, all_contraction_rates, all_fragment_counts]):
-                sections.append("\n### Writing Rhythm Targets")
-                sections.append(
+                append("\n### Writing Rhythm Targets")
+                append(
                     "Match these quantitative style targets from the physician's "
                     "approved outputs:"
                 )
                 if all_avg_lengths:
                     avg = round(sum(all_avg_lengths) / len(all_avg_lengths), 1)
-                    sections.append(f"- Average sentence length: ~{avg} words")
+                    append(f"- Average sentence length: ~{avg} words")
                 if all_contraction_rates:
                     avg = round(sum(all_contraction_rates) / len(all_contraction_rates), 2)
                     pct = int(avg * 100)
                     if pct >= 20:
-                        sections.append(
+                        append(
                             f"- Contraction rate: {pct}% (physician frequently uses contractions)"
                         )
                     else:
-                        sections.append(
+                        append(
                             f"- Contraction rate: {pct}% (physician prefers formal phrasing)"
                         )
                 if all_fragment_counts:
                     avg = round(sum(all_fragment_counts) / len(all_fragment_counts), 1)
                     if avg >= 1:
-                        sections.append(
+                        append(
                             f"- Fragment sentences: ~{avg:.0f} per explanation "
                             f"(physician uses sentence fragments)"
                         )
 
         # 1g. Teaching points (personalized instructions)
         if teaching_points:
-            sections.append("\n## Teaching Points")
-            sections.append(
-                "The physician has provided the following personalized instructions.\n"
-                "These reflect their clinical style and preferences. Follow them closely\n"
-                "so the output matches how this physician communicates:"
-            )
+            append("\n## Teaching Points")
+            append(_TEACHING_POINTS_PREFACE)
             for tp in teaching_points:
-                source = tp.get("source", "own")
+                source = tp.get("source") or "own"
                 if source == "own":
-                    sections.append(f"- {tp['text']}")
+                    append(f"- {tp['text']}")
                 else:
-                    sections.append(f"- [From {source}] {tp['text']}")
+                    append(f"- [From {source}] {tp['text']}")
 
         # 1g2. Custom phrases (physician's natural voice)
         if custom_phrases:
-            sections.append("\n## Physician's Custom Phrases")
-            sections.append(
+            append("\n## Physician's Custom Phrases")
+            append(
                 "The physician commonly uses these phrases in their communications.\n"
                 "Incorporate these naturally where appropriate to match the physician's voice:"
             )
-            for phrase in custom_phrases:
-                sections.append(f'- "{phrase}"')
-
-        # 1h. Doctor editing patterns (learned from recent edits)
-        if recent_edits and not short_comment:
-            # Analyze patterns in the edits
-            shorter_count = sum(1 for e in recent_edits if e.get("shorter"))
-            longer_count = sum(1 for e in recent_edits if e.get("longer"))
-            avg_length_change = sum(e.get("length_change_pct", 0) for e in recent_edits) / len(recent_edits)
-            avg_para_change = sum(e.get("paragraph_change", 0) for e in recent_edits) / len(recent_edits)
-
-            guidance: list[str] = []
-            if shorter_count > longer_count and avg_length_change < -10:
-                guidance.append(
-                    f"The physician tends to shorten output by ~{abs(int(avg_length_change))}%. "
-                    f"Be more concise than the default output."
-                )
-            elif longer_count > shorter_count and avg_length_change > 10:
-                guidance.append(
-                    f"The physician tends to expand output by ~{int(avg_length_change)}%. "
-                    f"Provide more detail than the default output."
-                )
-
-            if avg_para_change < -0.5:
-                guidance.append(
-                    "The physician prefers fewer paragraphs. Combine related points."
-                )
-            elif avg_para_change > 0.5:
-                guidance.append(
-                    "The physician prefers more paragraphs for separation. "
-                    "Break up content into shorter paragraphs."
-                )
-
-            if guidance:
-                sections.append("\n## Doctor Editing Patterns")
-                sections.append(
-                    "Based on the physician's recent edits, adjust the output style:"
-                )
-                for g in guidance:
-                    sections.append(f"- {g}")
+            sections.extend([f'- "{phrase}"' for phrase in custom_phrases])
 
+    @staticmethod
+    def _append_no_edit_signal(
+        sections: list[str], no_edit_ratio: float | None,
+    ) -> None:
         # 1h2. No-edit positive signal
         if no_edit_ratio is not None and no_edit_ratio >= 0.7:
             sections.append("\n## Style Confidence Signal")
@@ -7702,179 +8154,20 @@ class PromptEngine:
                 f"Maintain the current approach — same level of detail, tone, structure, and phrasing."
             )
 
-        # 1h3. Word-level edit corrections (banned/preferred phrases, replacements)
-        if edit_corrections and not short_comment:
-            has_content = any(edit_corrections.get(k) for k in ("banned", "preferred", "replacements"))
-            if has_content:
-                sections.append("\n## Doctor's Style Corrections")
-                sections.append(
-                    "The physician consistently makes these word-level corrections. "
-                    "Apply them proactively:"
-                )
-                if edit_corrections.get("banned"):
-                    sections.append("\n**Phrases to AVOID** (physician consistently removes these):")
-                    for phrase in edit_corrections["banned"][:10]:
-                        sections.append(f'- Do NOT use: "{phrase}"')
-                if edit_corrections.get("preferred"):
-                    sections.append("\n**Phrases to USE** (physician consistently adds these):")
-                    for phrase in edit_corrections["preferred"][:10]:
-                        sections.append(f'- Use: "{phrase}"')
-                if edit_corrections.get("replacements"):
-                    sections.append("\n**Replacements** (physician consistently changes A to B):")
-                    for old, new in edit_corrections["replacements"][:10]:
-                        sections.append(f'- Instead of "{old}", use "{new}"')
-
-        # 1h3b. Vocabulary preferences (word-level swaps from edits)
-        if vocabulary_preferences and not short_comment:
-            has_vocab = vocabulary_preferences.get("preferred") or vocabulary_preferences.get("avoided")
-            if has_vocab:
-                sections.append("\n## Physician Vocabulary Preferences")
-                sections.append(
-                    "The physician prefers specific word choices. "
-                    "Use these preferences consistently:"
-                )
-                if vocabulary_preferences.get("avoided") and vocabulary_preferences.get("preferred"):
-                    avoided = vocabulary_preferences["avoided"]
-                    preferred = vocabulary_preferences["preferred"]
-                    for i in range(min(len(avoided), len(preferred))):
-                        sections.append(f'- Use "{preferred[i]}" instead of "{avoided[i]}"')
-                elif vocabulary_preferences.get("preferred"):
-                    sections.append("**Preferred words**: " + ", ".join(f'"{w}"' for w in vocabulary_preferences["preferred"]))
-
-        # 1h3c. Persistent style profile (consolidated learning)
-        if style_profile and not short_comment:
-            profile = style_profile.get("profile", {})
-            sample_count = style_profile.get("sample_count", 0)
-            if sample_count >= 3 and profile:
-                sections.append(f"\n## Learned Style Profile ({sample_count} samples)")
-                if "avg_paragraph_count" in profile:
-                    sections.append(f"- Target paragraph count: ~{profile['avg_paragraph_count']}")
-                if "avg_sentence_length" in profile:
-                    sections.append(f"- Average sentence length: ~{profile['avg_sentence_length']} words")
-                if "contraction_rate" in profile:
-                    rate = profile["contraction_rate"]
-                    if rate > 0.02:
-                        sections.append("- Use contractions naturally (physician style uses them)")
-                    else:
-                        sections.append("- Avoid contractions (physician style is more formal)")
-                if profile.get("preferred_openings"):
-                    openings = profile["preferred_openings"][:3]
-                    sections.append("- Preferred opening styles: " + "; ".join(f'"{o}"' for o in openings))
-                if profile.get("preferred_closings"):
-                    closings = profile["preferred_closings"][:3]
-                    sections.append("- Preferred closing styles: " + "; ".join(f'"{c}"' for c in closings))
-
-        # 1h3d. Preferred sign-off
-        if preferred_signoff and not short_comment:
-            sections.append("\n## Preferred Sign-off")
-            sections.append(
-                f'The physician consistently ends communications with: "{preferred_signoff}"\n'
-                f"End the overall_summary with this or a very similar closing."
-            )
-
-        # 1h3e. Medical term preferences
-        if term_preferences and not short_comment:
-            plain_terms = [t for t in term_preferences if not t.get("keep_technical")]
-            tech_terms = [t for t in term_preferences if t.get("keep_technical")]
-            if plain_terms or tech_terms:
-                sections.append("\n## Medical Term Preferences")
-                if plain_terms:
-                    sections.append("**Use plain language for these terms:**")
-                    for t in plain_terms[:10]:
-                        sections.append(
-                            f'- Instead of "{t["medical_term"]}", say "{t["preferred_phrasing"]}"'
-                        )
-                if tech_terms:
-                    sections.append("**Keep these terms technical:**")
-                    for t in tech_terms[:10]:
-                        sections.append(f'- Keep: "{t["medical_term"]}"')
-
-        # 1h3f. Context-specific conditional rules
-        if conditional_rules and not short_comment:
-            sections.append("\n## Context-Specific Patterns")
-            sections.append(
-                "The physician consistently uses these when results fall in this severity range:"
-            )
-            for rule in conditional_rules[:5]:
-                ptype = rule.get("pattern_type", "general")
-                label = ptype.replace("_", " ").title()
-                sections.append(f'- {label}: "{rule["phrase"]}"')
-
-        # 1h4. Quality feedback adjustments (from low-rated reports)
-        if quality_feedback and not short_comment:
-            sections.append("\n## Quality Feedback Adjustments")
-            sections.append(
-                "Based on the physician's recent feedback on output quality, "
-                "make these adjustments:"
-            )
-            for adjustment in quality_feedback:
-                sections.append(f"- {adjustment}")
-
-        # 1h5. Cross-type batch context (summaries from other reports in this batch)
-        if batch_prior_summaries and not short_comment:
-            sections.append("\n## Other Reports in This Batch")
-            sections.append(
-                "The following reports were processed in the same batch and likely belong "
-                "to the same patient. Reference relevant cross-type findings when interpreting "
-                "this report:"
-            )
-            for summary in batch_prior_summaries:
-                label = summary.get("label", "Report")
-                test_type_display = summary.get("test_type_display", "Unknown")
-                m_summary = summary.get("measurements_summary", "")
-                sections.append(f"\n### {label} ({test_type_display})")
-                if m_summary:
-                    sections.append(m_summary)
-
-        # 1h6. Secondary test types detected in this report
-        if parsed_report.secondary_test_types and not short_comment:
-            secondary_display = ", ".join(
-                t.replace("_", " ").title() for t in parsed_report.secondary_test_types[:3]
-            )
-            sections.append(f"\n## Multi-Type Report")
-            sections.append(
-                f"This report also contains findings from: {secondary_display}. "
-                f"Measurements from these secondary test types have been merged into the "
-                f"parsed data below. Address all relevant findings in your interpretation."
-            )
-
+    @staticmethod
+    def _append_measurements(
+        sections: list[str],
+        parsed_report: ParsedReport,
+        reference_ranges: dict,
+        lab_reference_ranges_section: str | None,
+    ) -> None:
         # 2. Parsed measurements with reference ranges
         sections.append("\n## Parsed Measurements")
         critical_values_found: list[str] = []
         if parsed_report.measurements:
-            for m in parsed_report.measurements:
-                ref_info = ""
-                if m.abbreviation in reference_ranges:
-                    rr = reference_ranges[m.abbreviation]
-                    parts: list[str] = []
-                    if rr.get("normal_min") is not None:
-                        parts.append(f"min={rr['normal_min']}")
-                    if rr.get("normal_max") is not None:
-                        parts.append(f"max={rr['normal_max']}")
-                    if parts:
-                        ref_info = (
-                            f" | Normal range: {', '.join(parts)} "
-                            f"{rr.get('unit', '')}"
-                        )
-
-                prior_info = ""
-                if m.prior_values:
-                    prior_parts = [
-                        f"{pv.time_label}: {pv.value} {m.unit}"
-                        for pv in m.prior_values
-                    ]
-                    prior_info = " | " + " | ".join(prior_parts)
-
-                # Flag critical/panic values prominently
-                critical_flag = ""
-                if m.status.value == "critical":
-                    critical_flag = " *** CRITICAL/PANIC VALUE ***"
-                    critical_values_found.append(f"{m.name} ({m.abbreviation}): {m.value} {m.unit}")
-
-                sections.append(
-                    f"- {m.name} ({m.abbreviation}): {m.value} {m.unit} "
-                    f"[status: {m.status.value}]{critical_flag}{prior_info}{ref_info}"
-                )
+            sections.extend(PromptEngine._measurement_rows(
+                parsed_report.measurements, reference_ranges, critical_values_found,
+            ))
 
         # Add critical value warning if any found
         if critical_values_found:
@@ -7899,31 +8192,70 @@ class PromptEngine:
         if lab_reference_ranges_section:
             sections.append(lab_reference_ranges_section)
 
-        # 2b. Prior results for trend comparison (if available)
-        if prior_results and not short_comment:
-            sections.append("\n## Prior Results (for trend comparison)")
-            sections.append(
-                "When a current measurement has a corresponding prior value, "
-                "briefly note the trend (stable, improved, worsened). "
-                "Do not over-interpret small fluctuations within normal range."
+    @staticmethod
+    def _measurement_rows(
+        measurements: list,
+        reference_ranges: dict,
+        critical_values_found: list[str],
+    ) -> Iterator[str]:
+        """Yield one formatted line per measurement, recording critical values."""
+        for m in measurements:
+            ref_info = ""
+            if m.abbreviation in reference_ranges:
+                rr = reference_ranges[m.abbreviation]
+                parts: list[str] = []
+                if rr.get("normal_min") is not None:
+                    parts.append(f"min={rr['normal_min']}")
+                if rr.get("normal_max") is not None:
+                    parts.append(f"max={rr['normal_max']}")
+                if parts:
+                    ref_info = (
+                        f" | Normal range: {', '.join(parts)} "
+                        f"{rr.get('unit', '')}"
+                    )
+
+            prior_info = ""
+            if m.prior_values:
+                prior_parts = [
+                    f"{pv.time_label}: {pv.value} {m.unit}"
+                    for pv in m.prior_values
+                ]
+                prior_info = " | " + " | ".join(prior_parts)
+
+            # Flag critical/panic values prominently
+            critical_flag = ""
+            if m.status.value == "critical":
+                critical_flag = " *** CRITICAL/PANIC VALUE ***"
+                critical_values_found.append(f"{m.name} ({m.abbreviation}): {m.value} {m.unit}")
+
+            yield (
+                f"- {m.name} ({m.abbreviation}): {m.value} {m.unit} "
+                f"[status: {m.status.value}]{critical_flag}{prior_info}{ref_info}"
             )
-            for prior in prior_results:
-                date = prior.get("date", "Unknown date")
-                measurements = prior.get("measurements", [])
-                if measurements:
-                    sections.append(f"\n### {date}")
-                    for m in measurements[:10]:  # Limit to avoid token bloat
-                        abbrev = m.get("abbreviation", "")
-                        value = m.get("value", "")
-                        unit = m.get("unit", "")
-                        status = m.get("status", "")
-                        sections.append(f"- {abbrev}: {value} {unit} [{status}]")
 
+    @staticmethod
+    def _prior_result_rows(prior: dict) -> Iterator[str]:
+        """Yield the heading and measurement lines for one prior result."""
+        measurements = prior.get("measurements", [])
+        if not measurements:
+            return
+        yield f"\n### {prior.get('date', 'Unknown date')}"
+        for m in measurements[:10]:  # Limit to avoid token bloat
+            abbrev = m.get("abbreviation", "")
+            value = m.get("value", "")
+            unit = m.get("unit", "")
+            status = m.get("status", "")
+            yield f"- {abbrev}: {value} {unit} [{status}]"
+
+    @staticmethod
+    def _append_report_findings(
+        sections: list[str], parsed_report: ParsedReport,
+    ) -> None:
+        append = sections.append
         # 3. Findings
         if parsed_report.findings:
-            sections.append("\n## Report Findings/Conclusions")
-            for f in parsed_report.findings:
-                sections.append(f"- {f}")
+            append("\n## Report Findings/Conclusions")
+            sections.extend([f"- {f}" for f in parsed_report.findings])
 
         # 4. Sections — include clinical context sections (indication, reason,
         #    findings, conclusions) to give the LLM richer context for interpretation
@@ -7935,36 +8267,17 @@ class PromptEngine:
                     "indication", "reason", "clinical history",
                     "history", "referral",
                 )):
-                    sections.append(f"\n## {s.name}")
-                    sections.append(s.content)
-
-        # 5. Glossary — only include terms referenced in measurements/findings
-        #    for short comment; full glossary for long-form
-        if short_comment:
-            # Build set of abbreviations and finding keywords for filtering
-            relevant_terms: set[str] = set()
-            for m in (parsed_report.measurements or []):
-                relevant_terms.add(m.abbreviation.upper())
-                for word in m.name.split():
-                    if len(word) > 3:
-                        relevant_terms.add(word.upper())
-            filtered_glossary = {
-                term: defn for term, defn in glossary.items()
-                if term.upper() in relevant_terms
-            }
-            if filtered_glossary:
-                sections.append(
-                    "\n## Glossary (use these definitions when explaining terms)"
-                )
-                for term, definition in filtered_glossary.items():
-                    sections.append(f"- **{term}**: {definition}")
-        else:
-            sections.append(
-                "\n## Glossary (use these definitions when explaining terms)"
-            )
-            for term, definition in glossary.items():
-                sections.append(f"- **{term}**: {definition}")
+                    append(f"\n## {s.name}")
+                    append(s.content)
 
+    @staticmethod
+    def _append_instructions(
+        sections: list[str],
+        parsed_report: ParsedReport,
+        refinement_instruction: str | None,
+        quick_reasons: list[str] | None,
+        effective_context: str | None,
+    ) -> None:
         # 6. Refinement instruction (if provided)
         if refinement_instruction:
             sections.append("\n## Refinement Instruction")
@@ -7977,14 +8290,7 @@ class PromptEngine:
         }
         is_perfusion = parsed_report.test_type in _PERFUSION_TYPES
 
-        sections.append(
-            "\n## Instructions\n"
-            "Using ONLY the data above, write a clinical interpretation as "
-            "the physician, ready to send directly to the patient. Call the "
-            "explain_report tool with your response. Include all measurements "
-            "listed above. Do not add measurements, findings, or treatment "
-            "recommendations not present in the data."
-        )
+        sections.append(_FINAL_INSTRUCTIONS)
 
         # Build priority ordering instruction
         priority_parts: list[str] = []
@@ -8018,19 +8324,7 @@ class PromptEngine:
         )
 
         if is_perfusion:
-            sections.append(
-                "\n**PERFUSION OVERRIDE**: This is a nuclear perfusion study. "
-                "Your FIRST paragraph must address perfusion and ischemia findings "
-                "(whether blood flow to all parts of the heart is adequate, whether "
-                "there are any perfusion defects or areas of reduced blood flow). "
-                "Do NOT mention ejection fraction, pumping function, or how "
-                "strongly/effectively the heart pumps until AFTER you have fully "
-                "discussed perfusion/ischemia findings. Ejection fraction should "
-                "appear no earlier than the third paragraph. This overrides the "
-                "general interpretation order above."
-            )
-
-        return "\n".join(sections)
+            sections.append(_PERFUSION_ORDER_OVERRIDE)
 
     # ------------------------------------------------------------------
     # Quick Normal — ultra-short reassurance message
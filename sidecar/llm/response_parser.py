@@ -12,8 +12,9 @@ from __future__ import annotations
 
 import logging
 import re
-from dataclasses import dataclass
-from typing import Optional
+import zlib
+from collections import Counter
+from typing import NamedTuple, Optional
 
 from api.analysis_models import ParsedReport
 from api.explain_models import ExplanationResult
@@ -21,8 +22,7 @@ from api.explain_models import ExplanationResult
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class ValidationIssue:
+class ValidationIssue(NamedTuple):
     severity: str  # "warning" or "error"
     message: str
 
@@ -44,12 +44,12 @@ def parse_and_validate_response(
 
     # 1. Parse into Pydantic model
     try:
-        result = ExplanationResult(**tool_result)
+        result = ExplanationResult.model_validate(tool_result)
     except Exception as e:
         raise ValueError(f"Failed to parse LLM response into schema: {e}")
 
     # 2. Build lookup of expected measurements
-    expected = {m.abbreviation: m for m in parsed_report.measurements}
+    expected = parsed_report.abbreviation_index
 
     # Only validate against pre-extracted measurements if we have them.
     # For unknown test types, the LLM extracts measurements from raw text,
@@ -57,58 +57,61 @@ def parse_and_validate_response(
     if not expected:
         return result, issues
 
-    # 3. Check each measurement in the response
+    # 3. Check each measurement in the response, keeping only those found
+    #    in the parsed report
+    kept = []
+    removed = 0
     for mexp in result.measurements:
-        if mexp.abbreviation not in expected:
+        abbrev = mexp.abbreviation
+        orig = expected.get(abbrev)
+        if orig is None:
             issues.append(
                 ValidationIssue(
                     severity="warning",
                     message=(
-                        f"LLM included measurement '{mexp.abbreviation}' "
+                        f"LLM included measurement '{abbrev}' "
                         f"not found in parsed report. Removing."
                     ),
                 )
             )
+            removed += 1
             continue
+        kept.append(mexp)
 
-        orig = expected[mexp.abbreviation]
+        orig_value = orig.value
+        orig_status = orig.status
 
         # Value check
-        if abs(mexp.value - orig.value) > 0.1:
+        if abs(mexp.value - orig_value) > 0.1:
             issues.append(
                 ValidationIssue(
                     severity="warning",
                     message=(
-                        f"Measurement '{mexp.abbreviation}': LLM reported "
-                        f"value {mexp.value} but parsed value is {orig.value}. "
+                        f"Measurement '{abbrev}': LLM reported "
+                        f"value {mexp.value} but parsed value is {orig_value}. "
                         f"Correcting to parsed value."
                     ),
                 )
             )
-            mexp.value = orig.value
+            mexp.value = orig_value
 
         # Status check
-        if mexp.status != orig.status:
+        if mexp.status != orig_status:
             issues.append(
                 ValidationIssue(
                     severity="warning",
                     message=(
-                        f"Measurement '{mexp.abbreviation}': LLM status "
+                        f"Measurement '{abbrev}': LLM status "
                         f"'{mexp.status}' differs from parsed status "
-                        f"'{orig.status}'. Correcting to parsed status."
+                        f"'{orig_status}'. Correcting to parsed status."
                     ),
                 )
             )
-            mexp.status = orig.status
+            mexp.status = orig_status
 
     # 4. Filter out hallucinated measurements
-    valid_abbreviations = set(expected.keys())
-    original_count = len(result.measurements)
-    result.measurements = [
-        m for m in result.measurements if m.abbreviation in valid_abbreviations
-    ]
-    if len(result.measurements) < original_count:
-        removed = original_count - len(result.measurements)
+    result.measurements = kept
+    if removed:
         issues.append(
             ValidationIssue(
                 severity="warning",
@@ -124,28 +127,22 @@ def parse_and_validate_response(
     #    measurement. Normal/unremarkable values are typically grouped or
     #    omitted in clinical communication, which is the correct behavior.
 
-    # 6. Expand bare medical abbreviations in patient-facing text
-    result.overall_summary = expand_abbreviations(result.overall_summary)
-    for f in result.key_findings:
-        f.explanation = expand_abbreviations(f.explanation)
-    for m in result.measurements:
-        m.plain_language = expand_abbreviations(m.plain_language)
-
-    # 7. Apply natural contractions to patient-facing text
-    result.overall_summary = apply_contractions(result.overall_summary)
-    for f in result.key_findings:
-        f.explanation = apply_contractions(f.explanation)
-    for m in result.measurements:
-        m.plain_language = apply_contractions(m.plain_language)
-
-    # 8. Auto-fix AI patterns at higher humanization levels
-    if humanization_level >= 4:
+    # 6–8. Expand bare medical abbreviations, apply natural contractions and,
+    #      at higher humanization levels, auto-fix AI patterns — one pass
+    #      over the patient-facing fields, each string rewritten in one go.
+    #      Skipped entirely when humanization is off; empty fields are left
+    #      as they are.
+    if humanization_level >= 1:
+        fix_ai = humanization_level >= 4
         aggressive = humanization_level >= 5
-        result.overall_summary = fix_ai_patterns(result.overall_summary, aggressive=aggressive)
+        if result.overall_summary:
+            result.overall_summary = _humanize_text(result.overall_summary, fix_ai, aggressive)
         for f in result.key_findings:
-            f.explanation = fix_ai_patterns(f.explanation, aggressive=aggressive)
+            if f.explanation:
+                f.explanation = _humanize_text(f.explanation, fix_ai, aggressive)
         for m in result.measurements:
-            m.plain_language = fix_ai_patterns(m.plain_language, aggressive=aggressive)
+            if m.plain_language:
+                m.plain_language = _humanize_text(m.plain_language, fix_ai, aggressive)
 
     # 9. Check for residual AI-like patterns in the summary
     if humanization_level >= 3:
@@ -161,6 +158,14 @@ def parse_and_validate_response(
     return result, issues
 
 
+def _humanize_text(text: str, fix_ai: bool, aggressive: bool) -> str:
+    """Apply the patient-facing rewrites (steps 6–8) to a single string."""
+    text = apply_contractions(expand_abbreviations(text))
+    if fix_ai:
+        text = fix_ai_patterns(text, aggressive=aggressive)
+    return text
+
+
 # ---------------------------------------------------------------------------
 # Abbreviation expansion post-processing
 # ---------------------------------------------------------------------------
@@ -247,6 +252,44 @@ _ABBREVIATION_MAP: list[tuple[str, str]] = [
 ]
 
 
+def _build_key_scan(
+    keys: frozenset[str], flags: int = 0,
+) -> tuple[re.Pattern, dict[str, frozenset[str]]]:
+    """Build one regex that finds every occurrence of any key in a single pass.
+
+    The zero-width lookahead reports a hit at each offset, so overlapping keys
+    ("hs-CRP"/"CRP") are all seen; longest-first ordering makes each hit the
+    longest key at that offset. The returned map (keyed by the lowercased hit
+    when ``flags`` includes IGNORECASE) adds the shorter keys that start at
+    the same offset ("LDL" for "LDL-P").
+    """
+    scan = re.compile(
+        "(?=("
+        + "|".join(re.escape(k) for k in sorted(keys, key=len, reverse=True))
+        + "))",
+        flags,
+    )
+    prefixes = {key: frozenset(k for k in keys if key.startswith(k)) for key in keys}
+    return scan, prefixes
+
+
+_ABBREVIATION_KEYS: frozenset[str] = frozenset(a for a, _ in _ABBREVIATION_MAP)
+_ABBREVIATION_SCAN_RE, _ABBREVIATION_PREFIXES = _build_key_scan(_ABBREVIATION_KEYS)
+
+# (abbrev, expansion, lowercased full name without the parenthetical,
+#  pattern, keys the expansion itself introduces)
+_ABBREVIATION_ENTRIES: list[tuple[str, str, str, re.Pattern, frozenset[str]]] = [
+    (
+        abbrev,
+        expansion,
+        expansion.split(" (")[0].lower(),
+        re.compile(r"\b" + re.escape(abbrev) + r"\b"),
+        frozenset(k for k in _ABBREVIATION_KEYS if k in expansion),
+    )
+    for abbrev, expansion in _ABBREVIATION_MAP
+]
+
+
 def expand_abbreviations(text: str) -> str:
     """Replace bare medical abbreviations with full names in patient text.
 
@@ -257,26 +300,41 @@ def expand_abbreviations(text: str) -> str:
     if not text:
         return text
 
-    for abbrev, expansion in _ABBREVIATION_MAP:
-        # If the full name (without the parenthetical) is already present, skip
-        full_name = expansion.split(" (")[0]
-        if full_name.lower() in text.lower():
+    # Single pass to find which abbreviations occur at all; the per-entry
+    # patterns below only run for those.
+    present: set[str] = set()
+    for m in _ABBREVIATION_SCAN_RE.finditer(text):
+        present |= _ABBREVIATION_PREFIXES[m.group(1)]
+    if not present:
+        return text
+
+    text_lower = text.lower()
+    for abbrev, expansion, full_lower, pattern, introduced in _ABBREVIATION_ENTRIES:
+        if abbrev not in present:
             continue
 
-        # Replace first bare occurrence (word-boundary match)
-        pattern = re.compile(r"\b" + re.escape(abbrev) + r"\b")
+        # If the full name (without the parenthetical) is already present, skip.
+        # Only entries whose abbreviation occurs get here, so a handful of
+        # substring checks beats a multi-name scan of the whole text.
+        if full_lower in text_lower:
+            continue
+
+        # Only the first word-boundary match is considered
+        m = pattern.search(text)
+        if m is None:
+            continue
+        start = m.start()
         # Don't replace if inside parentheses — e.g. "(LAD)" is already expanded
-        def _replace_first(m: re.Match, _exp=expansion) -> str:
-            start = m.start()
-            if start > 0 and text[start - 1] == "(":
-                return m.group(0)  # skip — inside parens
-            result = _exp
-            # Capitalize if at sentence start (pos 0, or after ". " / "? " / "! " / newline)
-            if start == 0 or (start >= 2 and text[start - 2] in ".?!"):
-                result = result[0].upper() + result[1:]
-            return result
-
-        text, count = pattern.subn(_replace_first, text, count=1)
+        if start > 0 and text[start - 1] == "(":
+            continue
+        result = expansion
+        # Capitalize if at sentence start (pos 0, or after ". " / "? " / "! " / newline)
+        if start == 0 or (start >= 2 and text[start - 2] in ".?!"):
+            result = result[0].upper() + result[1:]
+        text = text[:start] + result + text[m.end():]
+        text_lower = text.lower()
+        # Later entries must see abbreviations the expansion itself contains
+        present |= introduced
 
     return text
 
@@ -333,15 +391,32 @@ _CONTRACTION_MAP: list[tuple[str, str]] = [
     ("let us", "let's"),
 ]
 
+# Formal phrase (lowercase) → contraction, in priority order; no-ops like
+# "this is" → "this is" are dropped.
+_CONTRACTION_LOOKUP: dict[str, str] = {
+    formal.lower(): contracted
+    for formal, contracted in _CONTRACTION_MAP
+    if formal.lower() != contracted.lower()
+}
+
 # Pre-compile patterns for performance
-_CONTRACTION_PATTERNS: list[tuple[re.Pattern, str]] = []
-for _formal, _contracted in _CONTRACTION_MAP:
-    if _formal.lower() == _contracted.lower():
-        continue  # skip no-ops like "this is" → "this is"
-    _CONTRACTION_PATTERNS.append((
-        re.compile(r"\b" + re.escape(_formal) + r"\b", re.IGNORECASE),
-        _contracted,
-    ))
+_CONTRACTION_PATTERNS: list[tuple[str, re.Pattern]] = [
+    (formal, re.compile(r"\b" + re.escape(formal) + r"\b", re.IGNORECASE))
+    for formal in _CONTRACTION_LOOKUP
+]
+
+_CONTRACTION_SCAN_RE, _CONTRACTION_PREFIXES = _build_key_scan(
+    frozenset(_CONTRACTION_LOOKUP), re.IGNORECASE,
+)
+
+
+def _contract(m: re.Match) -> str:
+    original = m.group(0)
+    replacement = _CONTRACTION_LOOKUP[original.lower()]
+    # Preserve leading capitalization
+    if original[0].isupper():
+        return replacement[0].upper() + replacement[1:]
+    return replacement
 
 
 def apply_contractions(text: str) -> str:
@@ -353,14 +428,18 @@ def apply_contractions(text: str) -> str:
     if not text:
         return text
 
-    for pattern, replacement in _CONTRACTION_PATTERNS:
-        def _contract(m: re.Match) -> str:
-            original = m.group(0)
-            # Preserve leading capitalization
-            if original[0].isupper():
-                return replacement[0].upper() + replacement[1:]
-            return replacement
-        text = pattern.sub(_contract, text)
+    # One combined scan picks out the phrases that occur; those are then
+    # applied in priority order so "you will not" still becomes "you won't"
+    # rather than the leftmost "you'll not".
+    present: set[str] = set()
+    for m in _CONTRACTION_SCAN_RE.finditer(text):
+        present |= _CONTRACTION_PREFIXES[m.group(1).lower()]
+    if not present:
+        return text
+
+    for formal, pattern in _CONTRACTION_PATTERNS:
+        if formal in present:
+            text = pattern.sub(_contract, text)
 
     return text
 
@@ -392,6 +471,11 @@ _BANNED_PHRASES = [
     "i hope this clarifies",
 ]
 
+# Runs of text between sentence-ending punctuation
+_SENTENCE_RE = re.compile(r"[^.!?]+")
+
+_OVERUSED_TRANSITION_RE = re.compile(r"additionally|furthermore")
+
 
 def check_ai_patterns(overall_summary: str) -> list[str]:
     """Scan LLM output for residual AI-like patterns. Returns warning strings."""
@@ -399,11 +483,14 @@ def check_ai_patterns(overall_summary: str) -> list[str]:
         return []
 
     warnings: list[str] = []
-    sentences = [s.strip() for s in re.split(r"[.!?]+", overall_summary) if s.strip()]
 
-    # Check for consecutive "Your" sentence starters
+    # Check for consecutive "Your" sentence starters, stopping at the first
+    # streak of 3 instead of splitting the whole summary up front
     your_streak = 0
-    for s in sentences:
+    for m in _SENTENCE_RE.finditer(overall_summary):
+        s = m.group(0).strip()
+        if not s:
+            continue
         if s.lower().startswith("your"):
             your_streak += 1
             if your_streak >= 3:
@@ -419,8 +506,9 @@ def check_ai_patterns(overall_summary: str) -> list[str]:
             warnings.append(f"Banned phrase detected: '{phrase}'")
 
     # Check for "Additionally"/"Furthermore" overuse
-    for word in ["additionally", "furthermore"]:
-        count = lower.count(word)
+    transition_counts = Counter(_OVERUSED_TRANSITION_RE.findall(lower))
+    for word in ("additionally", "furthermore"):
+        count = transition_counts[word]
         if count > 1:
             warnings.append(f"'{word}' used {count} times")
 
@@ -489,14 +577,50 @@ _TRANSITION_REPLACEMENTS: list[tuple[str, list[str]]] = [
     ("to summarize,", ["So —", "In short,", "Bottom line:"]),
 ]
 
-# Pre-compile patterns for banned phrases
-_FIX_BANNED_PATTERNS = [
-    (re.compile(r"\b" + re.escape(phrase) + r"\b", re.IGNORECASE), phrase)
-    for phrase in _FIX_BANNED_PHRASES
-]
+# One alternation for all banned phrases, longest first
+_FIX_BANNED_RE = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(p) for p in sorted(_FIX_BANNED_PHRASES, key=len, reverse=True))
+    + r")\b",
+    re.IGNORECASE,
+)
+
+_TRANSITION_ALTERNATIVES: dict[str, list[str]] = dict(_TRANSITION_REPLACEMENTS)
 
-# Counter for rotating through transition alternatives
-_transition_counter = 0
+_TRANSITION_RE = re.compile(
+    r"\b(?:"
+    + "|".join(re.escape(formal) for formal, _ in _TRANSITION_REPLACEMENTS)
+    + ")",
+    re.IGNORECASE,
+)
+
+
+def _replace_transition(m: re.Match) -> str:
+    formal = m.group(0).lower()
+    alternatives = _TRANSITION_ALTERNATIVES[formal]
+    # Deterministic pick from the phrase and its offset: repeated transitions
+    # still vary, with no shared state between calls or threads. crc32 rather
+    # than hash() so the choice is stable across processes.
+    start = m.start()
+    replacement = alternatives[zlib.crc32(formal.encode(), start) % len(alternatives)]
+    # Preserve capitalization context
+    if start == 0 or (start >= 2 and m.string[start - 2] in ".!?\n"):
+        return replacement[0].upper() + replacement[1:]
+    return replacement
+
+
+_TRAILING_ZERO_RE = re.compile(r"(\d+)\.0(%|\s|,|\.(?:\s|$))")
+
+# Cleanup of artifacts left by phrase removal
+_DOUBLE_SPACE_RE = re.compile(r"  +")
+_SPACE_PUNCT_RE = re.compile(r" ([,.])")
+_DOUBLE_PERIOD_RE = re.compile(r"\.\s*\.")
+_LEADING_WS_RE = re.compile(r"^\s+", re.MULTILINE)
+_CAP_AFTER_PERIOD_RE = re.compile(r"(\.\s+)([a-z])")
+
+
+def _cap_after_period(m: re.Match) -> str:
+    return m.group(1) + m.group(2).upper()
 
 
 def fix_ai_patterns(text: str, aggressive: bool = False) -> str:
@@ -511,37 +635,23 @@ def fix_ai_patterns(text: str, aggressive: bool = False) -> str:
         return text
 
     # 1. Strip banned phrases
-    for pattern, _ in _FIX_BANNED_PATTERNS:
-        text = pattern.sub("", text)
+    text = _FIX_BANNED_RE.sub("", text)
 
     # 2. Replace formal transitions (aggressive mode only)
     if aggressive:
-        global _transition_counter
-        for formal, alternatives in _TRANSITION_REPLACEMENTS:
-            pat = re.compile(r"\b" + re.escape(formal), re.IGNORECASE)
-            def _replace_transition(m: re.Match, _alts=alternatives) -> str:
-                global _transition_counter
-                replacement = _alts[_transition_counter % len(_alts)]
-                _transition_counter += 1
-                # Preserve capitalization context
-                if m.start() == 0 or (m.start() >= 2 and text[m.start() - 2] in ".!?\n"):
-                    return replacement[0].upper() + replacement[1:]
-                return replacement
-            text = pat.sub(_replace_transition, text)
+        text = _TRANSITION_RE.sub(_replace_transition, text)
 
         # 3. Strip trailing .0 from whole numbers (e.g., "60.0%" → "60%")
-        text = re.sub(r"(\d+)\.0(%|\s|,|\.(?:\s|$))", r"\1\2", text)
+        text = _TRAILING_ZERO_RE.sub(r"\1\2", text)
 
     # 4. Clean up artifacts from removals
-    text = re.sub(r"  +", " ", text)          # double spaces
-    text = re.sub(r" ([,.])", r"\1", text)     # space before punctuation
-    text = re.sub(r"\.\s*\.", ".", text)        # double periods
-    text = re.sub(r"^\s+", "", text, flags=re.MULTILINE)  # leading whitespace on lines
+    text = _DOUBLE_SPACE_RE.sub(" ", text)          # double spaces
+    text = _SPACE_PUNCT_RE.sub(r"\1", text)         # space before punctuation
+    text = _DOUBLE_PERIOD_RE.sub(".", text)         # double periods
+    text = _LEADING_WS_RE.sub("", text)             # leading whitespace on lines
 
     # 5. Capitalize after period if removal left lowercase
-    def _cap_after_period(m: re.Match) -> str:
-        return m.group(1) + m.group(2).upper()
-    text = re.sub(r"(\.\s+)([a-z])", _cap_after_period, text)
+    text = _CAP_AFTER_PERIOD_RE.sub(_cap_after_period, text)
 
     return text.strip()
 
@@ -566,21 +676,21 @@ def check_measurement_diversity(
 
     warnings: list[str] = []
 
-    # Extract the first ~5 words of each plain_language as a pattern signature
-    openers: list[str] = []
-    for m in measurements:
-        text = getattr(m, "plain_language", "") or ""
-        words = text.split()[:5]
-        if len(words) >= 3:
-            # Normalize: lowercase, strip the specific measurement name
-            opener = " ".join(words[:3]).lower()
-            openers.append(opener)
+    # The first 3 words of each plain_language (lowercased) are its pattern
+    # signature; texts shorter than 3 words are ignored
+    openers: list[str] = [
+        " ".join(words).lower()
+        for words in (
+            (getattr(m, "plain_language", "") or "").split()[:3]
+            for m in measurements
+        )
+        if len(words) == 3
+    ]
 
     if not openers:
         return warnings
 
     # Count how many share the same 3-word opener
-    from collections import Counter
     opener_counts = Counter(openers)
     most_common_opener, most_common_count = opener_counts.most_common(1)[0]
 
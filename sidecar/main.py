@@ -4,19 +4,50 @@ import re
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 
 from api.auth import AuthMiddleware, REQUIRE_AUTH
 from api.middleware import add_cors_middleware
 from api.routes import router
 from server import find_free_port, start_server
 from storage import get_db, get_keychain
+from test_types.registry import refresh_correction_cache
 
 _logger = logging.getLogger(__name__)
 
 _USE_PG = bool(os.getenv("DATABASE_URL", ""))
 _SENTRY_DSN = os.getenv("SENTRY_DSN", "")
 
+# Mode-specific imports are resolved once at import time rather than on
+# every create_app()/lifespan run. Web-only modules (billing, slowapi, the
+# PostgreSQL layer) are still never imported in desktop mode.
+if _USE_PG:
+    from storage.pg_database import (
+        _get_pool,
+        close_pool,
+        enforce_data_retention,
+        run_migrations,
+    )
+
+if REQUIRE_AUTH:
+    from slowapi.errors import RateLimitExceeded
+
+    from api.account import router as account_router
+    from api.admin import router as admin_router
+    from api.audit import AuditMiddleware
+    from api.baa import router as baa_router
+    from api.billing import (
+        BillingMiddleware,
+        admin_billing_router,
+        billing_router,
+        webhook_router,
+    )
+    from api.practice import router as practice_router
+    from api.rate_limit import limiter, rate_limit_exceeded_handler
+
+# Body of the catch-all 500, serialized once (same bytes JSONResponse renders).
+_INTERNAL_ERROR_BODY = b'{"detail":"Internal server error."}'
+
 # PHI patterns to scrub from error reports (covers HIPAA Safe Harbor identifiers)
 _PHI_PATTERNS = [
     re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),                    # SSN
@@ -31,7 +62,14 @@ _PHI_PATTERNS = [
 ]
 
 
+# Something every pattern above needs: a digit, "@", a URL prefix, or a
+# patient/name/date-of label. Text without any of these is returned as-is.
+_PHI_CANDIDATE = re.compile(r"[\d@]|https?://|www\.|(?i:patient|name|date of)")
+
+
 def _scrub_phi(text: str) -> str:
+    if not _PHI_CANDIDATE.search(text):
+        return text
     for pattern in _PHI_PATTERNS:
         text = pattern.sub("[REDACTED]", text)
     return text
@@ -73,7 +111,6 @@ async def lifespan(app: FastAPI):
     # Startup
     if _USE_PG:
         # Initialize PostgreSQL connection pool and run migrations
-        from storage.pg_database import _get_pool, run_migrations, enforce_data_retention
         await _get_pool()
         await run_migrations()
         await enforce_data_retention()
@@ -83,13 +120,11 @@ async def lifespan(app: FastAPI):
         get_keychain()
 
     # Load correction-based detection adjustments (both PG and SQLite)
-    from test_types.registry import refresh_correction_cache
     await refresh_correction_cache()
 
     yield
     # Shutdown
     if _USE_PG:
-        from storage.pg_database import close_pool
         await close_pool()
 
 
@@ -100,11 +135,6 @@ def create_app() -> FastAPI:
     # CORS must be outermost so ALL responses (including 500s) get headers.
     app.add_middleware(AuthMiddleware)
     if REQUIRE_AUTH:
-        from api.billing import BillingMiddleware
-        from api.audit import AuditMiddleware
-        from api.rate_limit import limiter, rate_limit_exceeded_handler
-        from slowapi.errors import RateLimitExceeded
-
         app.add_middleware(BillingMiddleware)
         app.add_middleware(AuditMiddleware)
         app.state.limiter = limiter
@@ -115,19 +145,15 @@ def create_app() -> FastAPI:
     @app.exception_handler(Exception)
     async def _unhandled_exception_handler(request: Request, exc: Exception):
         _logger.exception("Unhandled exception on %s %s", request.method, request.url.path)
-        return JSONResponse(
+        return Response(
+            content=_INTERNAL_ERROR_BODY,
             status_code=500,
-            content={"detail": "Internal server error."},
+            media_type="application/json",
         )
 
     app.include_router(router)
     # Billing + account + admin management endpoints (web mode only)
     if REQUIRE_AUTH:
-        from api.billing import billing_router, admin_billing_router, webhook_router
-        from api.account import router as account_router
-        from api.admin import router as admin_router
-        from api.practice import router as practice_router
-        from api.baa import router as baa_router
         app.include_router(billing_router)
         app.include_router(admin_billing_router)
         app.include_router(webhook_router)
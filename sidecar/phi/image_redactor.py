@@ -9,7 +9,7 @@ from __future__ import annotations
 
 import logging
 
-from PIL import Image, ImageDraw
+from PIL import Image, ImageColor, ImageDraw
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +24,19 @@ def redact_image_phi(image: Image.Image) -> Image.Image:
     Returns a copy of the image with the regions blacked out.
     """
     img = image.copy()
-    draw = ImageDraw.Draw(img)
     w, h = img.size
-    # Black out top 12% (patient demographics header)
-    draw.rectangle([0, 0, w, int(h * 0.12)], fill="black")
-    # Black out bottom 5% (footer with MRN/account repeats)
-    draw.rectangle([0, int(h * 0.95), w, h], fill="black")
+    # Top 12% (patient demographics header) and bottom 5% (footer with
+    # MRN/account repeats). Boxes are end-exclusive, so the header box runs
+    # one row past int(h * 0.12) to match the inclusive rectangle it replaced.
+    header = (0, 0, w, int(h * 0.12) + 1)
+    footer = (0, int(h * 0.95), w, h)
+    if img.mode == "P":
+        # Palette images need "black" resolved through the palette.
+        draw = ImageDraw.Draw(img)
+        draw.rectangle([0, 0, w, int(h * 0.12)], fill="black")
+        draw.rectangle([0, int(h * 0.95), w, h], fill="black")
+        return img
+    black = ImageColor.getcolor("black", img.mode)
+    img.paste(black, header)
+    img.paste(black, footer)
     return img
@@ -7,44 +7,36 @@ Only modifies the copy sent to the API -- never the original text stored locally
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import re
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class ScrubResult:
     scrubbed_text: str
     phi_found: list[str]
     redaction_count: int
 
 
-_PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
+# Each entry is (category, pattern, replacement, literals). ``literals`` are
+# lowercase strings at least one of which is in every match (the pattern's
+# labels), so scrub_phi can skip the pattern when none is in the text.
+# None means the pattern has no required literal and always runs.
+_PHI_PATTERNS: list[tuple[str, re.Pattern, str, tuple[str, ...] | None]] = [
     # Catch-all: redact everything after "patient name:" (or similar labels)
-    # regardless of name format. Must come before structured name patterns.
+    # regardless of name format. Every structured "Patient: John Doe" /
+    # "Name: Doe, Jane" match is also a match of this pattern, so no
+    # separate structured pattern is needed for these labels.
     (
         "patient_name",
         re.compile(
             r"(?i)(?:patient\s+name|patient|pt\.?\s*name|pt\.?|name)\s*[:=]\s*[^\n]+"
         ),
         "[PATIENT NAME REDACTED]",
-    ),
-    # Patient name: "Patient: John Doe", "Name: Jane Smith", "Pt: John Doe"
-    # Also handles "Patient Name:", "Pt Name:", "Pt.:", variations with commas
-    # (Last, First), and optional suffixes/middle initials.
-    (
-        "patient_name",
-        re.compile(
-            r"(?i)(?:patient|patient\s+name|pt\.?\s*name|pt\.?|name)\s*[:=]\s*"
-            r"(?:"
-            # Last, First Middle? format
-            r"[A-Z][a-z]+(?:\-[A-Z][a-z]+)?\s*,\s*[A-Z][a-z]+(?:\s+[A-Z]\.?)?"
-            r"|"
-            # First Middle? Last format
-            r"[A-Z][a-z]+(?:\s+[A-Z]\.?)?\s+[A-Z][a-z]+(?:\-[A-Z][a-z]+)?"
-            r")"
-            r"(?:\s+(?:Jr|Sr|II|III|IV)\.?)?"
-        ),
-        "[PATIENT NAME REDACTED]",
+        ("patient", "pt", "name"),
     ),
     # Patient name on labeled lines with broader labels seen in reports:
     # "PATIENT:", "CLIENT:", "SUBJECT:", "Examinee:"
@@ -60,6 +52,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"(?:\s+(?:Jr|Sr|II|III|IV)\.?)?"
         ),
         "[PATIENT NAME REDACTED]",
+        ("client", "subject", "examinee", "individual"),
     ),
     # Date of birth — labeled: "DOB: 01/15/1980", "Date of Birth: January 15, 1980"
     # Also handles "D.O.B.", "Birth Date", "Birthdate", "Born: ..."
@@ -72,6 +65,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"\d{4}[/\-]\d{1,2}[/\-]\d{1,2})"
         ),
         "[DOB REDACTED]",
+        ("dob", "d.o.b.", "birth", "born"),
     ),
     # MRN / Medical Record Number — many label variants
     (
@@ -84,6 +78,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"[A-Z0-9\-]{4,20}"
         ),
         "[MRN REDACTED]",
+        ("mrn", "m.r.n.", "rec"),
     ),
     # MRN: bare parenthesized format common in EHR headers/footers
     # e.g. "Anderson, Joseph N ( 030868921)" or "(MRN 030868921)"
@@ -93,6 +88,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"\(\s*(?:MRN\s*)?([0-9]{6,20})\s*\)"
         ),
         "[MRN REDACTED]",
+        None,
     ),
     # SSN: "123-45-6789" or labeled "SSN: 123-45-6789"
     (
@@ -102,18 +98,21 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"\d{3}-\d{2}-\d{4}"
         ),
         "[SSN REDACTED]",
+        ("ssn", "social"),
     ),
     # SSN: bare pattern without label (with hyphens)
     (
         "ssn",
         re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),
         "[SSN REDACTED]",
+        None,
     ),
     # SSN: bare 9-digit without hyphens (must not be inside a longer number)
     (
         "ssn",
         re.compile(r"(?<!\d)\d{9}(?!\d)"),
         "[SSN REDACTED]",
+        None,
     ),
     # Phone: "(555) 123-4567", "555-123-4567", "555.123.4567"
     # Also handles labeled: "Phone: ...", "Tel: ...", "Fax: ..."
@@ -125,6 +124,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"(?<!\d)(?:\+?1[\s.\-]?)?\(?\d{3}\)?[\s.\-]?\d{3}[\s.\-]?\d{4}(?!\d)"
         ),
         "[PHONE REDACTED]",
+        None,
     ),
     # Email address
     (
@@ -133,6 +133,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"(?i)(?:e-?mail\s*[:=]\s*)?[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}"
         ),
         "[EMAIL REDACTED]",
+        ("@",),
     ),
     # Address: street number + name + suffix (with optional apt/suite/unit)
     (
@@ -147,6 +148,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"\b"
         ),
         "[ADDRESS REDACTED]",
+        None,
     ),
     # Labeled address: "Address: ..." — catch full line after label
     (
@@ -156,6 +158,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"street\s+address)\s*[:=]\s*[^\n]+"
         ),
         "[ADDRESS REDACTED]",
+        ("addr",),
     ),
     # City, State ZIP — "Springfield, IL 62704" or "New York, NY 10001-1234"
     (
@@ -165,6 +168,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"[A-Z]{2}\s+\d{5}(?:-\d{4})?"
         ),
         "[ADDRESS REDACTED]",
+        None,
     ),
     # Standalone ZIP code labeled: "Zip: 62704"
     (
@@ -173,6 +177,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"(?i)(?:zip\s*(?:code)?|postal\s*code)\s*[:=]\s*\d{5}(?:-\d{4})?"
         ),
         "[ZIP REDACTED]",
+        ("zip", "postal"),
     ),
     # Insurance / Policy / Group numbers (before account pattern to match first)
     # NOTE: "plan" requires a qualifier (number/#/ID) to avoid matching
@@ -185,6 +190,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"[A-Z0-9\-]{4,20}"
         ),
         "[INSURANCE REDACTED]",
+        ("insurance", "policy", "group", "member", "subscriber"),
     ),
     (
         "insurance",
@@ -193,6 +199,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"[A-Z0-9\-]{4,20}"
         ),
         "[INSURANCE REDACTED]",
+        ("plan",),
     ),
     # Account/ID number: "Account #: 123456789", "Visit #: ...", "Encounter: ..."
     (
@@ -203,6 +210,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"[A-Z0-9\-]{4,20}"
         ),
         "[ACCOUNT REDACTED]",
+        ("account", "acct", "visit", "encounter", "case"),
     ),
     # Dates beyond DOB — catch labeled date lines in medical reports
     (
@@ -212,6 +220,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"\s*[:=]?\s*[^\n]{1,30}"
         ),
         "[DATE REDACTED]",
+        ("date of ",),
     ),
     # Exam/study date patterns (MM/DD/YYYY after date-like labels)
     (
@@ -222,6 +231,10 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}"
         ),
         "[DATE REDACTED]",
+        (
+            "date", "exam", "study", "performed", "acquired", "admitted",
+            "discharged", "procedure", "service",
+        ),
     ),
     # Ages over 89 (HIPAA Safe Harbor requires grouping as 90+)
     (
@@ -231,6 +244,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             re.IGNORECASE,
         ),
         "[AGE 90+ REDACTED]",
+        ("year", "yr", "yo", "y/o", "y.o."),
     ),
     # URLs
     (
@@ -239,6 +253,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"https?://[^\s<>\"']+|www\.[^\s<>\"']+"
         ),
         "[URL REDACTED]",
+        ("http", "www."),
     ),
     # Certificate / license numbers: "License #: MD123456", "Cert No: CA-12345"
     (
@@ -249,6 +264,7 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"[A-Z0-9\-]{5,20}"
         ),
         "[CERTIFICATE REDACTED]",
+        ("cert", "lic", "registration"),
     ),
     # Device / equipment serial numbers: "Serial: ABC-123456", "SN: 12345"
     (
@@ -258,40 +274,104 @@ _PHI_PATTERNS: list[tuple[str, re.Pattern, str]] = [
             r"[A-Z0-9\-]{5,20}"
         ),
         "[SERIAL REDACTED]",
+        ("serial", "sn", "s.n."),
     ),
     # IP addresses: "192.168.1.1" (HIPAA Safe Harbor identifier #18)
     (
         "ip_address",
         re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b"),
         "[IP REDACTED]",
-    ),
-    # Physician names: "Ordering Physician: Dr. John Smith"
-    (
-        "physician_name",
-        re.compile(
-            r"(?i)(?:Referred\s+by|Referring\s+Physician|Ordering\s+Physician"
-            r"|Ordered\s+by|Referring\s+Provider|Attending\s+Physician"
-            r"|Requesting\s+Physician|Primary\s+Care\s+Physician|Clinician"
-            r"|Interpreting\s+Physician|Interpreted\s+by|Read\s+by"
-            r"|Electronically\s+Signed\s+by|Signed\s+by|Dictated\s+by"
-            r"|Verified\s+by|Approved\s+by|Reported\s+by|Finalized\s+by"
-            r"|Supervising\s+Physician|Sonographer|Technologist"
-            r"|Practice\s+Provider|Provider)"
-            r"\s*[:\-]?\s*"
-            r"(?:Dr\.?\s*)?"
-            r"[A-Za-z][A-Za-z\s.\-']+?"
-            r"(?=\s*(?:\n|$|(?:,\s*(?:MD|DO|NP|PA|Ph\.?D|FACC|FACS|FASE|FHRS"
-            r"|RPVI|RN|RDCS|RDMS|RT|MBA|MPH|MS|BSN|ARNP|CNP|CRNP|DNP))|"
-            r"(?:\s+(?:MD|DO|NP|PA|Ph\.?D|FACC|FACS|FASE|FHRS"
-            r"|RPVI|RN|RDCS|RDMS|RT|MBA|MPH|MS|BSN|ARNP|CNP|CRNP|DNP))"
-            r"|\s+on\s+\d))"
-        ),
-        "[PHYSICIAN REDACTED]",
+        None,
     ),
 ]
 
 
-def _build_provider_patterns(names: list[str]) -> list[re.Pattern]:
+# Non-ASCII letters that (?i) matches against ASCII ones: dotted and dotless
+# i, long s, and the Kelvin sign.
+_ASCII_FOLD_RE = re.compile("[\u0130\u0131\u017f\u212a]")
+
+# Physician names: "Ordering Physician: Dr. John Smith". Applied after
+# _PHI_PATTERNS by _subn_physician_names, which walks the label matches
+# itself so a long line of labels is not rescanned from every one of them.
+_PHYSICIAN_LABEL = (
+    r"(?:Referred\s+by|Referring\s+Physician|Ordering\s+Physician"
+    r"|Ordered\s+by|Referring\s+Provider|Attending\s+Physician"
+    r"|Requesting\s+Physician|Primary\s+Care\s+Physician|Clinician"
+    r"|Interpreting\s+Physician|Interpreted\s+by|Read\s+by"
+    r"|Electronically\s+Signed\s+by|Signed\s+by|Dictated\s+by"
+    r"|Verified\s+by|Approved\s+by|Reported\s+by|Finalized\s+by"
+    r"|Supervising\s+Physician|Sonographer|Technologist"
+    r"|Practice\s+Provider|Provider)"
+)
+# Possessive: splitting the separator whitespace differently can never
+# move where the name starts.
+_PHYSICIAN_LEAD = _PHYSICIAN_LABEL + r"\s*+[:\-]?\s*+(?:Dr\.?\s*+)?"
+_PHYSICIAN_NAME_RE = re.compile(
+    r"(?i)" + _PHYSICIAN_LEAD +
+    # The name may end anywhere from its second character on, but inside a
+    # whitespace run the lookahead can only hold where it held at the run's
+    # first position, so whitespace past the second character is taken as
+    # a whole run. Likewise no lookahead alternative starts inside a run,
+    # so its whitespace is possessive. This keeps long runs linear.
+    r"[A-Za-z][A-Za-z\s.\-'](?:[A-Za-z.\-']|\s++)*?"
+    r"(?=[^\S\n]*+\n|\s*+(?:$|,\s*(?:MD|DO|NP|PA|Ph\.?D|FACC|FACS|FASE|FHRS"
+    r"|RPVI|RN|RDCS|RDMS|RT|MBA|MPH|MS|BSN|ARNP|CNP|CRNP|DNP))"
+    r"|\s++(?:MD|DO|NP|PA|Ph\.?D|FACC|FACS|FASE|FHRS"
+    r"|RPVI|RN|RDCS|RDMS|RT|MBA|MPH|MS|BSN|ARNP|CNP|CRNP|DNP|on\s+\d))"
+)
+# Stage one: where a label starts. Stage two: where its name would start,
+# and the run of name characters the lazy name match can extend over.
+_PHYSICIAN_LABEL_RE = re.compile(r"(?i)" + _PHYSICIAN_LABEL)
+_PHYSICIAN_LEAD_RE = re.compile(r"(?i)" + _PHYSICIAN_LEAD + r"(?=[A-Za-z])")
+_PHYSICIAN_NAME_RUN_RE = re.compile(r"(?i)[A-Za-z\s.\-']*")
+
+
+def _subn_physician_names(text: str, repl: str) -> tuple[str, int]:
+    """``_PHYSICIAN_NAME_RE.subn(repl, text)`` without the quadratic worst case.
+
+    When a label's name never reaches a credential, newline or end of text,
+    the regex has scanned the whole run of name characters after it. Any
+    later label inside that run can only end its name somewhere in the same
+    run, so it is skipped instead of rescanned. The one exception is a
+    label directly before a ":" that closes the run, since the separator
+    can step over the colon into the next run.
+    """
+    parts: list[str] = []
+    count = 0
+    copied = 0
+    search_from = 0
+    dead_from = dead_to = -1  # name ends in [dead_from, dead_to] never match
+    while True:
+        label = _PHYSICIAN_LABEL_RE.search(text, search_from)
+        if label is None:
+            break
+        start = label.start()
+        if (
+            dead_from <= start < dead_to
+            and not (text.startswith(":", dead_to) and not text[label.end():dead_to].strip())
+        ):
+            search_from = start + 1
+            continue
+        m = _PHYSICIAN_NAME_RE.match(text, start)
+        if m:
+            parts.append(text[copied:start])
+            parts.append(repl)
+            copied = search_from = m.end()
+            count += 1
+            continue
+        lead = _PHYSICIAN_LEAD_RE.match(text, start)
+        if lead:
+            dead_from = lead.end()
+            dead_to = _PHYSICIAN_NAME_RUN_RE.match(text, dead_from).end()
+        search_from = start + 1
+    if not count:
+        return text, 0
+    parts.append(text[copied:])
+    return "".join(parts), count
+
+
+@functools.lru_cache(maxsize=128)
+def _build_provider_patterns(names: tuple[str, ...]) -> tuple[re.Pattern, ...]:
     """Build whole-word regex patterns for practice provider names.
 
     For each name, matches the bare name and optional "Dr."/"Dr" prefix.
@@ -301,6 +381,8 @@ def _build_provider_patterns(names: list[str]) -> list[re.Pattern]:
 
     E.g. provider "Dr. Bruce" → matches "Matthew Bruce", "Dr. Bruce",
     "Bruce, MD", "George A. Bruce, MD, FACC", etc.
+
+    Cached per provider roster, so each practice's patterns are compiled once.
     """
     _CREDENTIALS = r"(?:\s*,?\s*(?:MD|DO|NP|PA|Ph\.?D|FACC|FACS|FSCAI|FACP|RN|BSN|MSN|DNP)\.?)*"
     patterns = []
@@ -333,7 +415,7 @@ def _build_provider_patterns(names: list[str]) -> list[re.Pattern]:
                 rf"{escaped}"
                 rf"{_CREDENTIALS}\b"
             ))
-    return patterns
+    return tuple(patterns)
 
 
 # ---------------------------------------------------------------------------
@@ -424,6 +506,20 @@ def _extract_patient_names(text: str) -> list[str]:
     return unique
 
 
+def _compile_variant_patterns(variants: list[str]) -> list[re.Pattern]:
+    """Compile the Pass 2 pattern for each patient-name variant.
+
+    Allows an optional middle initial or suffix after the name. Not
+    memoized here, since the variants are patient names.
+    """
+    return [
+        re.compile(
+            rf"(?i)\b{re.escape(variant)}(?:\s+[A-Z]\.?)?(?:\s+(?:Jr|Sr|II|III|IV)\.?)?\b"
+        )
+        for variant in variants
+    ]
+
+
 def scrub_phi(text: str, provider_names: list[str] | None = None) -> ScrubResult:
     """Remove PHI patterns from text. Returns scrubbed copy."""
     scrubbed = text
@@ -435,37 +531,58 @@ def scrub_phi(text: str, provider_names: list[str] | None = None) -> ScrubResult
     patient_name_variants = _extract_patient_names(text)
 
     # --- Pass 1: standard pattern-based scrubbing
-    for category, pattern, replacement in _PHI_PATTERNS:
-        matches = pattern.findall(scrubbed)
-        if matches:
+    # Patterns whose label literals are all absent are skipped. The check is
+    # only trusted when the text has none of the non-ASCII letters that
+    # IGNORECASE folds onto ASCII ones.
+    text_lower = None if _ASCII_FOLD_RE.search(scrubbed) else scrubbed.lower()
+    for category, pattern, replacement, literals in _PHI_PATTERNS:
+        if (
+            literals
+            and text_lower is not None
+            and not any(lit in text_lower for lit in literals)
+        ):
+            continue
+        scrubbed, count = pattern.subn(replacement, scrubbed)
+        if count:
             categories_found.add(category)
-            total_redactions += len(matches)
-            scrubbed = pattern.sub(replacement, scrubbed)
+            total_redactions += count
+            if text_lower is not None:
+                text_lower = scrubbed.lower()
+    scrubbed, count = _subn_physician_names(scrubbed, "[PHYSICIAN REDACTED]")
+    if count:
+        categories_found.add("physician_name")
+        total_redactions += count
 
     # --- Pass 2: scrub bare patient name occurrences
     # Uses the name extracted in Pass 0 to catch unlabeled repetitions
     # (EHR headers, footers, inline references like "Anderson, Joseph N").
     if patient_name_variants:
-        for variant in patient_name_variants:
-            escaped = re.escape(variant)
-            # Allow optional middle initial or suffix after the name
-            pat = re.compile(
-                rf"(?i)\b{escaped}(?:\s+[A-Z]\.?)?(?:\s+(?:Jr|Sr|II|III|IV)\.?)?\b"
-            )
-            matches = pat.findall(scrubbed)
-            if matches:
+        # Skip variants the text does not contain. IGNORECASE also folds a
+        # few non-ASCII letters (long s "ſ" matches "s"), so the substring
+        # check is only trusted when both sides are ASCII.
+        text_lower = scrubbed.lower() if scrubbed.isascii() else None
+        patterns = _compile_variant_patterns(patient_name_variants)
+        for variant, pat in zip(patient_name_variants, patterns):
+            if (
+                text_lower is not None
+                and variant.isascii()
+                and variant.lower() not in text_lower
+            ):
+                continue
+            scrubbed, count = pat.subn("[PATIENT NAME REDACTED]", scrubbed)
+            if count:
                 categories_found.add("patient_name")
-                total_redactions += len(matches)
-                scrubbed = pat.sub("[PATIENT NAME REDACTED]", scrubbed)
+                total_redactions += count
+                if text_lower is not None:
+                    text_lower = scrubbed.lower()
 
     # --- Pass 3: scrub practice provider names (bare names without labels)
     if provider_names:
-        for pat in _build_provider_patterns(provider_names):
-            matches = pat.findall(scrubbed)
-            if matches:
+        for pat in _build_provider_patterns(tuple(provider_names)):
+            scrubbed, count = pat.subn("[PHYSICIAN REDACTED]", scrubbed)
+            if count:
                 categories_found.add("physician_name")
-                total_redactions += len(matches)
-                scrubbed = pat.sub("[PHYSICIAN REDACTED]", scrubbed)
+                total_redactions += count
 
     return ScrubResult(
         scrubbed_text=scrubbed,
@@ -474,6 +591,34 @@ def scrub_phi(text: str, provider_names: list[str] | None = None) -> ScrubResult
     )
 
 
+async def scrub_phi_async(
+    text: str, provider_names: list[str] | None = None
+) -> ScrubResult:
+    """``scrub_phi`` on the default executor, for whole reports in handlers.
+
+    A long report takes tens of milliseconds to scrub; running it in a
+    worker thread lets the event loop keep serving other requests.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        None, scrub_phi, text, provider_names
+    )
+
+
+# Patient identity hints used by compute_patient_fingerprint.
+_FINGERPRINT_NAME_RE = re.compile(
+    r"(?i)(?:patient(?:\s*name)?|name)\s*[:\-]\s*"
+    r"([A-Za-z][A-Za-z\s.\-']{2,40}?)(?=\s*(?:\n|$|,|\s{2}))",
+)
+_FINGERPRINT_DOB_RE = re.compile(
+    r"(?i)(?:DOB|Date\s+of\s+Birth|Birth\s*Date)\s*[:\-]\s*"
+    r"(\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4})",
+)
+_FINGERPRINT_MRN_RE = re.compile(
+    r"(?i)(?:MRN|Medical\s+Record|Account|Accession)\s*(?:#|No\.?|Number)?\s*[:\-]?\s*"
+    r"([A-Z0-9]{4,20})",
+)
+
+
 def compute_patient_fingerprint(text: str) -> str:
     """Compute a deterministic hash of patient identity hints from raw text.
 
@@ -484,39 +629,26 @@ def compute_patient_fingerprint(text: str) -> str:
 
     Returns an empty string if no patient identifiers are found.
     """
-    import hashlib
-
+    # Tokens are collected in their sorted order (dob < mrn < name), which
+    # is the order stored fingerprints were hashed in.
     tokens: list[str] = []
 
-    # Patient name (from label patterns)
-    name_pat = re.compile(
-        r"(?i)(?:patient(?:\s*name)?|name)\s*[:\-]\s*"
-        r"([A-Za-z][A-Za-z\s.\-']{2,40}?)(?=\s*(?:\n|$|,|\s{2}))",
-    )
-    m = name_pat.search(text)
-    if m:
-        tokens.append("name:" + re.sub(r"\s+", " ", m.group(1).strip().upper()))
-
     # DOB
-    dob_pat = re.compile(
-        r"(?i)(?:DOB|Date\s+of\s+Birth|Birth\s*Date)\s*[:\-]\s*"
-        r"(\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4})",
-    )
-    m = dob_pat.search(text)
+    m = _FINGERPRINT_DOB_RE.search(text)
     if m:
         tokens.append("dob:" + m.group(1).strip())
 
     # MRN / account
-    mrn_pat = re.compile(
-        r"(?i)(?:MRN|Medical\s+Record|Account|Accession)\s*(?:#|No\.?|Number)?\s*[:\-]?\s*"
-        r"([A-Z0-9]{4,20})",
-    )
-    m = mrn_pat.search(text)
+    m = _FINGERPRINT_MRN_RE.search(text)
     if m:
         tokens.append("mrn:" + m.group(1).strip().upper())
 
+    # Patient name (from label patterns)
+    m = _FINGERPRINT_NAME_RE.search(text)
+    if m:
+        tokens.append("name:" + " ".join(m.group(1).upper().split()))
+
     if not tokens:
         return ""
 
-    combined = "|".join(sorted(tokens))
-    return hashlib.sha256(combined.encode()).hexdigest()
+    return hashlib.sha256("|".join(tokens).encode()).hexdigest()
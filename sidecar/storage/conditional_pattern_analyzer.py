@@ -10,6 +10,9 @@ import json
 import re
 from typing import Any
 
+from storage.database import _severity_band, get_db
+from storage.pg_database import _get_pool
+
 
 # Patterns that indicate structural communication choices (not clinical content)
 _REASSURANCE_PATTERNS = re.compile(
@@ -39,13 +42,35 @@ _ESCALATION_PATTERNS = re.compile(
 )
 
 
+# Lowercase literals at least one of which every match of the pattern above
+# must contain. A phrase with none of them cannot match, so the regex is
+# skipped. Keep these in sync when editing the patterns.
+_REASSURANCE_HINTS = (
+    "reassur", "encouraging", "good news", "no ", "continue ", "everything ",
+    "results are ",
+)
+_FOLLOWUP_HINTS = ("we ", "recommend ", "in ", "schedule ", "worth ")
+_ESCALATION_HINTS = (
+    "warrant", "recommend", "important ", "please ", "should ", "need to ",
+)
+
+
 def _classify_phrase(phrase: str) -> str:
     """Classify a phrase as reassurance, follow_up, escalation, or general."""
-    if _REASSURANCE_PATTERNS.search(phrase):
+    # IGNORECASE also folds a few non-ASCII letters (e.g. U+017F) onto ASCII
+    # ones, which str.lower() does not; only prefilter pure-ASCII phrases.
+    lower = phrase.lower() if phrase.isascii() else None
+    if (lower is None or any(h in lower for h in _REASSURANCE_HINTS)) and (
+        _REASSURANCE_PATTERNS.search(phrase)
+    ):
         return "reassurance"
-    if _FOLLOWUP_PATTERNS.search(phrase):
+    if (lower is None or any(h in lower for h in _FOLLOWUP_HINTS)) and (
+        _FOLLOWUP_PATTERNS.search(phrase)
+    ):
         return "follow_up"
-    if _ESCALATION_PATTERNS.search(phrase):
+    if (lower is None or any(h in lower for h in _ESCALATION_HINTS)) and (
+        _ESCALATION_PATTERNS.search(phrase)
+    ):
         return "escalation"
     return "general"
 
@@ -66,13 +91,25 @@ def _is_clinical_content(phrase: str) -> bool:
     return bool(clinical_indicators.search(phrase))
 
 
+# Sentence terminator plus the whitespace after it. Matching the
+# terminator itself (rather than a lookbehind) lets the regex engine skip
+# straight to candidate positions.
+_SENTENCE_END = re.compile(r'[.!?]\s+')
+
+
 def _extract_sentences(text: str) -> list[str]:
     """Split text into sentences, filtering out very short/long ones."""
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    return [
-        s.strip() for s in sentences
-        if 15 <= len(s.strip()) <= 200
-    ]
+    sentences: list[str] = []
+    start = 0
+    for m in _SENTENCE_END.finditer(text):
+        s = text[start:m.start() + 1].strip()
+        if 15 <= len(s) <= 200:
+            sentences.append(s)
+        start = m.end()
+    s = text[start:].strip()
+    if 15 <= len(s) <= 200:
+        sentences.append(s)
+    return sentences
 
 
 async def analyze_and_store_patterns(
@@ -86,11 +123,8 @@ async def analyze_and_store_patterns(
     Groups outputs by severity band, finds phrases that appear in >= 3 outputs
     of one band, and stores them as conditional rules.
     """
-    from storage.database import _severity_band
-
     # Fetch recent liked/copied outputs with severity_score
     if is_pg:
-        from storage.pg_database import get_pg_db, _get_pool
         pool = await _get_pool()
         async with pool.acquire() as conn:
             rows = await conn.fetch(
@@ -102,8 +136,6 @@ async def analyze_and_store_patterns(
             )
         rows = [dict(r) for r in rows]
     else:
-        import sqlite3
-        from storage.database import get_db
         conn = db._get_conn() if hasattr(db, '_get_conn') else get_db()._get_conn()
         try:
             raw_rows = conn.execute(
@@ -145,57 +177,67 @@ async def analyze_and_store_patterns(
     # Find phrases appearing in >= 3 outputs of one band but rarely in others
     all_bands = list(band_sentences.keys())
 
+    # Normalized sentence keys per band (truncated for fuzzy matching), and
+    # how often each key occurs across all bands
+    band_keys: dict[str, list[str]] = {}
+    total_counts: dict[str, int] = {}
+    for band in all_bands:
+        keys = [s.lower().strip()[:80] for s in band_sentences[band]]
+        band_keys[band] = keys
+        for key in keys:
+            total_counts[key] = total_counts.get(key, 0) + 1
+
+    # (severity_band, phrase, pattern_type) for every rule found
+    rules: list[tuple[str, str, str]] = []
     for band in all_bands:
         sentences = band_sentences[band]
         if len(sentences) < 3:
             continue
 
-        # Count sentence occurrences (normalized)
+        # Count sentence occurrences (normalized), remembering the first
+        # original-case sentence seen for each key
         phrase_counts: dict[str, int] = {}
-        for s in sentences:
-            normalized = s.lower().strip()
-            # Truncate for fuzzy matching
-            key = normalized[:80]
+        first_sentence: dict[str, str] = {}
+        for s, key in zip(sentences, band_keys[band]):
             phrase_counts[key] = phrase_counts.get(key, 0) + 1
+            first_sentence.setdefault(key, s)
 
         # Find phrases with count >= 3
-        other_sentences_set = set()
-        for other_band in all_bands:
-            if other_band != band:
-                for s in band_sentences[other_band]:
-                    other_sentences_set.add(s.lower().strip()[:80])
-
         for phrase_key, count in phrase_counts.items():
             if count < 3:
                 continue
-            # Skip if phrase also appears frequently in other bands
-            if phrase_key in other_sentences_set:
+            # Skip if phrase also appears in other bands
+            if total_counts[phrase_key] > count:
                 continue
             # Skip clinical content
             if _is_clinical_content(phrase_key):
                 continue
 
-            # Find original-case version
-            original_phrase = phrase_key
-            for s in sentences:
-                if s.lower().strip()[:80] == phrase_key:
-                    original_phrase = s
-                    break
-
+            original_phrase = first_sentence[phrase_key]
             pattern_type = _classify_phrase(original_phrase)
 
-            # Store the rule
-            if is_pg:
-                pool = await _get_pool()
-                async with pool.acquire() as conn:
-                    await conn.execute(
-                        """INSERT INTO conditional_rules
-                           (user_id, test_type, severity_band, phrase, pattern_type, count, updated_at)
-                           VALUES ($1, $2, $3, $4, $5, 1, NOW())
-                           ON CONFLICT(user_id, test_type, severity_band, phrase) DO UPDATE SET
-                           count = conditional_rules.count + 1,
-                           pattern_type = $5, updated_at = NOW()""",
-                        user_id, test_type, band, original_phrase, pattern_type,
-                    )
-            else:
-                db.upsert_conditional_rule(test_type, band, original_phrase, pattern_type)
+            rules.append((band, original_phrase, pattern_type))
+
+    if not rules:
+        return
+
+    # Store the rules
+    if is_pg:
+        pool = await _get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(
+                    """INSERT INTO conditional_rules
+                       (user_id, test_type, severity_band, phrase, pattern_type, count, updated_at)
+                       VALUES ($1, $2, $3, $4, $5, 1, NOW())
+                       ON CONFLICT(user_id, test_type, severity_band, phrase) DO UPDATE SET
+                       count = conditional_rules.count + 1,
+                       pattern_type = $5, updated_at = NOW()""",
+                    [
+                        (user_id, test_type, band, phrase, pattern_type)
+                        for band, phrase, pattern_type in rules
+                    ],
+                )
+    else:
+        for band, phrase, pattern_type in rules:
+            db.upsert_conditional_rule(test_type, band, phrase, pattern_type)
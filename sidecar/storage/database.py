@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import atexit
 import json
 import os
 import sqlite3
+import threading
+import time
 import uuid
-from datetime import datetime, timezone
 from typing import Any
 
 import platformdirs
@@ -14,7 +16,8 @@ import platformdirs
 
 def _now() -> str:
     """Return current UTC time as ISO 8601 string."""
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    # time.gmtime() avoids building an aware datetime on every write.
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
 
 import re
@@ -205,6 +208,7 @@ CREATE TABLE IF NOT EXISTS history (
     was_edited INTEGER NOT NULL DEFAULT 0
 );
 CREATE INDEX IF NOT EXISTS idx_history_created_at ON history(created_at);
+CREATE INDEX IF NOT EXISTS idx_history_type_created ON history(test_type, created_at);
 
 CREATE TABLE IF NOT EXISTS templates (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -267,6 +271,44 @@ CREATE TABLE IF NOT EXISTS shared_templates (
 """
 
 
+# Trigram full-text indexes over the searchable text columns, kept in sync
+# with triggers. They only narrow list_history()/list_letters() searches;
+# the LIKE filters still decide the final result. Requires FTS5 with the
+# trigram tokenizer (SQLite 3.34+); without it searches fall back to plain
+# LIKE scans.
+_FTS_COLUMNS: dict[str, tuple[str, ...]] = {
+    "history": ("summary", "test_type_display", "filename"),
+    "letters": ("content", "prompt"),
+}
+
+
+def _fts_schema(table: str, columns: tuple[str, ...]) -> str:
+    """Return the script creating and populating ``{table}_fts``."""
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return f"""
+BEGIN;
+CREATE VIRTUAL TABLE {fts} USING fts5(
+    {cols},
+    content='{table}', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN
+    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});
+END;
+CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN
+    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});
+END;
+CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});
+    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});
+END;
+INSERT INTO {fts}({fts}) VALUES ('rebuild');
+COMMIT;
+"""
+
+
 def _get_db_path() -> str:
     """Return OS-appropriate path for explify.db."""
     data_dir = platformdirs.user_data_dir("Explify")
@@ -274,192 +316,371 @@ def _get_db_path() -> str:
     return os.path.join(data_dir, "explify.db")
 
 
+# Stored in PRAGMA user_version once _migrate has run. Bump it whenever a
+# migration or backfill is added so existing files pick it up.
+_SCHEMA_VERSION = 1
+
+# Idle connections kept per Database; extras opened under load are closed.
+_POOL_SIZE = 4
+# Prepared statements cached per connection. Pooled connections live long
+# enough to reuse them, and this module has more distinct queries than
+# sqlite3's default of 128.
+_STATEMENT_CACHE_SIZE = 256
+# Per-connection settings, applied once when a pooled connection is opened.
+# synchronous=NORMAL is durable against app crashes in WAL mode; only an OS
+# crash or power loss can drop the most recent commits.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+)
+
+
+class _PooledConnection(sqlite3.Connection):
+    """Connection whose close() returns it to its Database's idle pool.
+
+    Callers keep the usual ``try: ... finally: conn.close()`` shape. Any
+    uncommitted work is rolled back on close, exactly as a real close would
+    discard it, so a reused connection never carries a stale transaction.
+    """
+
+    _pool: _ConnectionPool | None = None
+
+    def close(self) -> None:
+        if self.in_transaction:
+            self.rollback()
+        pool = self._pool
+        if pool is None or not pool.release(self):
+            super().close()
+
+
+class _ConnectionPool:
+    """Small LIFO pool of idle connections, shared across threads.
+
+    A connection is only ever held by one caller at a time, so nested
+    calls (a method using a connection while calling another one) still
+    get distinct connections.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self._db_path = db_path
+        self._idle: list[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self) -> _PooledConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        conn = sqlite3.connect(
+            self._db_path,
+            factory=_PooledConnection,
+            check_same_thread=False,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn._pool = self
+        return conn
+
+    def release(self, conn: _PooledConnection) -> bool:
+        """Keep *conn* for reuse; False if the caller should really close it."""
+        with self._lock:
+            if any(c is conn for c in self._idle):
+                return True  # already released (double close)
+            if self._closed or len(self._idle) >= _POOL_SIZE:
+                return False
+            self._idle.append(conn)
+            return True
+
+    def close_all(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            sqlite3.Connection.close(conn)
+
+
 class Database:
     """SQLite-backed storage for settings and history."""
 
     def __init__(self, db_path: str | None = None) -> None:
         self._db_path = db_path or _get_db_path()
+        self._pool = _ConnectionPool(self._db_path)
+        self._fts_tables: set[str] = set()
         self._init_db()
 
     def _get_conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self._db_path)
+        conn = self._pool.acquire()
         conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")
         return conn
 
+    def close_all(self) -> None:
+        """Close every pooled connection; later calls open unpooled ones."""
+        self._pool.close_all()
+
     def _init_db(self) -> None:
         conn = self._get_conn()
         try:
+            # WAL is persistent in the database file, so it is set once here
+            # rather than on every connection.
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.executescript(_SCHEMA)
-            conn.commit()
-            # Migrations for existing databases
-            migrations = [
-                "ALTER TABLE history ADD COLUMN liked INTEGER NOT NULL DEFAULT 0",
-                "ALTER TABLE history ADD COLUMN tone_preference INTEGER",
-                "ALTER TABLE history ADD COLUMN detail_preference INTEGER",
-                "CREATE TABLE IF NOT EXISTS teaching_points (id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL, test_type TEXT, created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')))",
-                "ALTER TABLE templates ADD COLUMN is_builtin INTEGER NOT NULL DEFAULT 0",
-                "ALTER TABLE letters ADD COLUMN liked INTEGER NOT NULL DEFAULT 0",
-                "ALTER TABLE letters ADD COLUMN model_used TEXT",
-                "ALTER TABLE letters ADD COLUMN input_tokens INTEGER",
-                "ALTER TABLE letters ADD COLUMN output_tokens INTEGER",
-                "ALTER TABLE history ADD COLUMN copied INTEGER NOT NULL DEFAULT 0",
-                "ALTER TABLE history ADD COLUMN updated_at TEXT",
-                "ALTER TABLE history ADD COLUMN sync_id TEXT",
-                "ALTER TABLE letters ADD COLUMN updated_at TEXT",
-                "ALTER TABLE letters ADD COLUMN sync_id TEXT",
-                "ALTER TABLE teaching_points ADD COLUMN updated_at TEXT",
-                "ALTER TABLE teaching_points ADD COLUMN sync_id TEXT",
-                "ALTER TABLE settings ADD COLUMN updated_at TEXT",
-                "ALTER TABLE templates ADD COLUMN sync_id TEXT",
-                "ALTER TABLE history ADD COLUMN edited_text TEXT",
-                "ALTER TABLE templates ADD COLUMN is_default INTEGER NOT NULL DEFAULT 0",
-                "ALTER TABLE history ADD COLUMN quality_rating INTEGER",
-                "ALTER TABLE history ADD COLUMN quality_note TEXT",
-                "ALTER TABLE history ADD COLUMN tone_used INTEGER",
-                "ALTER TABLE history ADD COLUMN detail_used INTEGER",
-                "ALTER TABLE history ADD COLUMN literacy_used TEXT",
-                "ALTER TABLE history ADD COLUMN was_edited INTEGER NOT NULL DEFAULT 0",
-                "CREATE TABLE IF NOT EXISTS style_profiles (test_type TEXT PRIMARY KEY, profile TEXT NOT NULL, sample_count INTEGER NOT NULL DEFAULT 0, updated_at TEXT)",
-                "ALTER TABLE history ADD COLUMN severity_score REAL",
-                "ALTER TABLE style_profiles ADD COLUMN last_data_at TEXT",
-                # New tables for personalization features
-                """CREATE TABLE IF NOT EXISTS term_preferences (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    medical_term TEXT NOT NULL,
-                    test_type TEXT,
-                    preferred_phrasing TEXT NOT NULL,
-                    keep_technical INTEGER NOT NULL DEFAULT 0,
-                    source TEXT NOT NULL DEFAULT 'edit',
-                    count INTEGER NOT NULL DEFAULT 1,
-                    updated_at TEXT,
-                    UNIQUE(medical_term, test_type)
-                )""",
-                """CREATE TABLE IF NOT EXISTS conditional_rules (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    test_type TEXT NOT NULL,
-                    severity_band TEXT NOT NULL,
-                    phrase TEXT NOT NULL,
-                    pattern_type TEXT NOT NULL DEFAULT 'general',
-                    count INTEGER NOT NULL DEFAULT 1,
-                    updated_at TEXT,
-                    UNIQUE(test_type, severity_band, phrase)
-                )""",
-                """CREATE TABLE IF NOT EXISTS detection_corrections (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    detected_type TEXT NOT NULL,
-                    corrected_type TEXT NOT NULL,
-                    report_title TEXT,
-                    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
-                )""",
-                """CREATE INDEX IF NOT EXISTS idx_detection_corrections_types
-                    ON detection_corrections(detected_type, corrected_type)""",
-            ]
-            for migration in migrations:
+            # Migrations only run when the file predates _SCHEMA_VERSION;
+            # an up-to-date database skips straight to the FTS/seed checks.
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < _SCHEMA_VERSION:
+                self._migrate(conn)
+
+            # Full-text indexes for history/letters search
+            for tbl, columns in _FTS_COLUMNS.items():
                 try:
-                    conn.execute(migration)
-                    conn.commit()
+                    has_fts = conn.execute(
+                        "SELECT 1 FROM sqlite_master WHERE name = ?", (f"{tbl}_fts",)
+                    ).fetchone()
+                    if not has_fts:
+                        conn.executescript(_fts_schema(tbl, columns))
+                    self._fts_tables.add(tbl)
                 except sqlite3.OperationalError:
-                    pass  # Column already exists
-            # Backfill sync_id and updated_at for existing rows
-            for tbl in ("history", "letters", "teaching_points", "templates"):
-                try:
-                    rows = conn.execute(
-                        f"SELECT id FROM {tbl} WHERE sync_id IS NULL"
-                    ).fetchall()
-                    for row in rows:
-                        conn.execute(
-                            f"UPDATE {tbl} SET sync_id = ? WHERE id = ?",
-                            (str(uuid.uuid4()), row["id"]),
-                        )
-                    conn.commit()
-                except sqlite3.OperationalError:
-                    pass
+                    if conn.in_transaction:
+                        conn.rollback()
+
+            # Seed built-in templates if none exist (check and insert in one
+            # statement)
+            cursor = conn.execute(
+                """INSERT INTO templates (name, test_type, tone, structure_instructions, closing_text, is_builtin, sync_id)
+                   SELECT ?, ?, ?, ?, ?, 1, ?
+                   WHERE NOT EXISTS (SELECT 1 FROM templates WHERE is_builtin = 1)""",
+                (
+                    "Lipid Panel",
+                    "Lipids",
+                    "concerned",
+                    "Patient should understand that their goal LDL is less than 70 and they are not yet at goal so we will be adjusting the therapeutic approach.",
+                    "Please let us know if you have any questions.",
+                    str(uuid.uuid4()),
+                ),
+            )
+            if cursor.rowcount:
+                conn.commit()
+        finally:
+            conn.close()
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Bring an older database file up to _SCHEMA_VERSION."""
+        # Migrations and backfills run in one transaction, committed once
+        # below. A failing statement (e.g. a column that already exists)
+        # only rolls back itself, not the transaction.
+        conn.execute("BEGIN")
+        # Migrations for existing databases: tables added after the first
+        # release, then columns missing from older tables. Existing
+        # columns are read once per table, so only missing ones are
+        # ALTERed (no failed ALTER per column on every start).
+        table_migrations = [
+            "CREATE TABLE IF NOT EXISTS teaching_points (id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL, test_type TEXT, created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')))",
+            "CREATE TABLE IF NOT EXISTS style_profiles (test_type TEXT PRIMARY KEY, profile TEXT NOT NULL, sample_count INTEGER NOT NULL DEFAULT 0, updated_at TEXT)",
+            # New tables for personalization features
+            """CREATE TABLE IF NOT EXISTS term_preferences (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                medical_term TEXT NOT NULL,
+                test_type TEXT,
+                preferred_phrasing TEXT NOT NULL,
+                keep_technical INTEGER NOT NULL DEFAULT 0,
+                source TEXT NOT NULL DEFAULT 'edit',
+                count INTEGER NOT NULL DEFAULT 1,
+                updated_at TEXT,
+                UNIQUE(medical_term, test_type)
+            )""",
+            """CREATE TABLE IF NOT EXISTS conditional_rules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                test_type TEXT NOT NULL,
+                severity_band TEXT NOT NULL,
+                phrase TEXT NOT NULL,
+                pattern_type TEXT NOT NULL DEFAULT 'general',
+                count INTEGER NOT NULL DEFAULT 1,
+                updated_at TEXT,
+                UNIQUE(test_type, severity_band, phrase)
+            )""",
+            """CREATE TABLE IF NOT EXISTS detection_corrections (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                detected_type TEXT NOT NULL,
+                corrected_type TEXT NOT NULL,
+                report_title TEXT,
+                created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+            )""",
+            """CREATE INDEX IF NOT EXISTS idx_detection_corrections_types
+                ON detection_corrections(detected_type, corrected_type)""",
+        ]
+        for migration in table_migrations:
+            try:
+                conn.execute(migration)
+            except sqlite3.OperationalError:
+                pass
+        column_migrations: dict[str, list[tuple[str, str]]] = {
+            "history": [
+                ("liked", "INTEGER NOT NULL DEFAULT 0"),
+                ("tone_preference", "INTEGER"),
+                ("detail_preference", "INTEGER"),
+                ("copied", "INTEGER NOT NULL DEFAULT 0"),
+                ("updated_at", "TEXT"),
+                ("sync_id", "TEXT"),
+                ("edited_text", "TEXT"),
+                ("quality_rating", "INTEGER"),
+                ("quality_note", "TEXT"),
+                ("tone_used", "INTEGER"),
+                ("detail_used", "INTEGER"),
+                ("literacy_used", "TEXT"),
+                ("was_edited", "INTEGER NOT NULL DEFAULT 0"),
+                ("severity_score", "REAL"),
+            ],
+            "templates": [
+                ("is_builtin", "INTEGER NOT NULL DEFAULT 0"),
+                ("sync_id", "TEXT"),
+                ("is_default", "INTEGER NOT NULL DEFAULT 0"),
+            ],
+            "letters": [
+                ("liked", "INTEGER NOT NULL DEFAULT 0"),
+                ("model_used", "TEXT"),
+                ("input_tokens", "INTEGER"),
+                ("output_tokens", "INTEGER"),
+                ("updated_at", "TEXT"),
+                ("sync_id", "TEXT"),
+            ],
+            "teaching_points": [
+                ("updated_at", "TEXT"),
+                ("sync_id", "TEXT"),
+            ],
+            "settings": [
+                ("updated_at", "TEXT"),
+            ],
+            "style_profiles": [
+                ("last_data_at", "TEXT"),
+            ],
+        }
+        for tbl, columns in column_migrations.items():
+            existing = {
+                row["name"]
+                for row in conn.execute(f"PRAGMA table_info({tbl})")
+            }
+            for column, decl in columns:
+                if column in existing:
+                    continue
                 try:
-                    conn.execute(
-                        f"UPDATE {tbl} SET updated_at = COALESCE(updated_at, created_at, ?) WHERE updated_at IS NULL",
-                        (_now(),),
-                    )
-                    conn.commit()
+                    conn.execute(f"ALTER TABLE {tbl} ADD COLUMN {column} {decl}")
                 except sqlite3.OperationalError:
                     pass
-
-            # Backfill settings updated_at (settings has no created_at or id)
+        # Backfill sync_id and updated_at for existing rows
+        for tbl in ("history", "letters", "teaching_points", "templates"):
             try:
-                conn.execute(
-                    "UPDATE settings SET updated_at = ? WHERE updated_at IS NULL",
-                    (_now(),),
+                rows = conn.execute(
+                    f"SELECT id FROM {tbl} WHERE sync_id IS NULL"
+                ).fetchall()
+                conn.executemany(
+                    f"UPDATE {tbl} SET sync_id = ? WHERE id = ?",
+                    [(str(uuid.uuid4()), row["id"]) for row in rows],
                 )
-                conn.commit()
             except sqlite3.OperationalError:
                 pass
-
-            # Backfill severity_score from full_response JSON
             try:
-                rows_no_sev = conn.execute(
-                    "SELECT id, full_response FROM history WHERE severity_score IS NULL"
-                ).fetchall()
-                for row in rows_no_sev:
-                    try:
-                        fr = json.loads(row["full_response"]) if isinstance(row["full_response"], str) else row["full_response"]
-                        sev = fr.get("severity_score") if isinstance(fr, dict) else None
-                        if sev is not None:
-                            conn.execute(
-                                "UPDATE history SET severity_score = ? WHERE id = ?",
-                                (float(sev), row["id"]),
-                            )
-                    except (json.JSONDecodeError, TypeError, ValueError):
-                        pass
-                conn.commit()
+                conn.execute(
+                    f"UPDATE {tbl} SET updated_at = COALESCE(updated_at, created_at, ?) WHERE updated_at IS NULL",
+                    (_now(),),
+                )
             except sqlite3.OperationalError:
                 pass
 
-            # Indexes that depend on migrated columns
+        # Backfill settings updated_at (settings has no created_at or id)
+        try:
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_history_liked ON history(liked)"
+                "UPDATE settings SET updated_at = ? WHERE updated_at IS NULL",
+                (_now(),),
             )
-            conn.commit()
+        except sqlite3.OperationalError:
+            pass
 
-            # Deduplicate and create unique indexes on sync_id to prevent sync duplicates
-            for tbl in ("history", "letters", "templates", "teaching_points"):
+        # Backfill severity_score from full_response JSON
+        try:
+            rows_no_sev = conn.execute(
+                "SELECT id, full_response FROM history WHERE severity_score IS NULL"
+            ).fetchall()
+            for row in rows_no_sev:
                 try:
-                    # Delete duplicates, keeping the row with the lowest id (oldest)
-                    conn.execute(f"""
-                        DELETE FROM {tbl}
-                        WHERE id NOT IN (
-                            SELECT MIN(id) FROM {tbl}
+                    fr = json.loads(row["full_response"]) if isinstance(row["full_response"], str) else row["full_response"]
+                    sev = fr.get("severity_score") if isinstance(fr, dict) else None
+                    if sev is not None:
+                        conn.execute(
+                            "UPDATE history SET severity_score = ? WHERE id = ?",
+                            (float(sev), row["id"]),
+                        )
+                except (json.JSONDecodeError, TypeError, ValueError):
+                    pass
+        except sqlite3.OperationalError:
+            pass
+
+        # Indexes that depend on migrated columns. Liked/copied and
+        # edited rows are a small part of history, so these are partial
+        # indexes over just those rows (replacing the full index on liked).
+        conn.execute("DROP INDEX IF EXISTS idx_history_liked")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_liked_created"
+            " ON history(created_at) WHERE liked = 1"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_kept"
+            " ON history(test_type, updated_at) WHERE liked = 1 OR copied = 1"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_edited"
+            " ON history(test_type, updated_at) WHERE edited_text IS NOT NULL"
+        )
+
+        # Deduplicate and create unique indexes on sync_id to prevent sync duplicates
+        for tbl in ("history", "letters", "templates", "teaching_points"):
+            try:
+                # Delete duplicates, keeping the row with the lowest id (oldest)
+                conn.execute(f"""
+                    DELETE FROM {tbl}
+                    WHERE id IN (
+                        SELECT id FROM (
+                            SELECT id, row_number() OVER (
+                                PARTITION BY sync_id ORDER BY id
+                            ) AS rn
+                            FROM {tbl}
                             WHERE sync_id IS NOT NULL
-                            GROUP BY sync_id
-                        ) AND sync_id IS NOT NULL
-                    """)
-                    conn.commit()
-                    # Create unique index
-                    conn.execute(
-                        f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{tbl}_sync_id ON {tbl}(sync_id) WHERE sync_id IS NOT NULL"
+                        )
+                        WHERE rn > 1
                     )
-                    conn.commit()
-                except sqlite3.OperationalError:
-                    pass  # Index already exists or other issue
-
-            # Seed built-in templates if none exist
-            builtin_count = conn.execute(
-                "SELECT COUNT(*) as cnt FROM templates WHERE is_builtin = 1"
-            ).fetchone()["cnt"]
-            if builtin_count == 0:
+                """)
+                # Create unique index
                 conn.execute(
-                    """INSERT INTO templates (name, test_type, tone, structure_instructions, closing_text, is_builtin)
-                       VALUES (?, ?, ?, ?, ?, 1)""",
-                    (
-                        "Lipid Panel",
-                        "Lipids",
-                        "concerned",
-                        "Patient should understand that their goal LDL is less than 70 and they are not yet at goal so we will be adjusting the therapeutic approach.",
-                        "Please let us know if you have any questions.",
-                    ),
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{tbl}_sync_id ON {tbl}(sync_id) WHERE sync_id IS NOT NULL"
                 )
-                conn.commit()
-        finally:
-            conn.close()
+            except sqlite3.OperationalError:
+                pass  # Index already exists or other issue
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.commit()
+
+    def _add_fts_prefilter(
+        self, table: str, search: str, conditions: list[str], params: list[Any]
+    ) -> None:
+        """Restrict a LIKE search on *table* to rows its trigram index matches.
+
+        Any row the caller's ``LIKE '%search%'`` filters accept contains the
+        text, so the index can pick the candidates first. Skipped for terms
+        the trigram index cannot serve: shorter than three characters or
+        using LIKE wildcards.
+        """
+        if (
+            table not in self._fts_tables
+            or len(search) < 3
+            or "%" in search
+            or "_" in search
+        ):
+            return
+        conditions.append(
+            f"id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)"
+        )
+        params.append('"' + search.replace('"', '""') + '"')
 
     # --- Settings ---
 
@@ -484,6 +705,21 @@ class Database:
         finally:
             conn.close()
 
+    def set_settings(self, values: dict[str, str]) -> None:
+        """Upsert several settings in a single transaction."""
+        if not values:
+            return
+        conn = self._get_conn()
+        try:
+            now = _now()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO settings (key, value, updated_at) VALUES (?, ?, ?)",
+                    [(key, value, now) for key, value in values.items()],
+                )
+        finally:
+            conn.close()
+
     def get_all_settings(self) -> dict[str, str]:
         conn = self._get_conn()
         try:
@@ -517,9 +753,10 @@ class Database:
         try:
             sid = str(uuid.uuid4())
             now = _now()
-            cursor = conn.execute(
+            row = conn.execute(
                 """INSERT INTO history (test_type, test_type_display, filename, summary, full_response, tone_preference, detail_preference, sync_id, updated_at, severity_score)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   RETURNING *""",
                 (
                     test_type,
                     test_type_display,
@@ -532,13 +769,11 @@ class Database:
                     now,
                     severity_score,
                 ),
-            )
-            conn.commit()
-            row = conn.execute(
-                "SELECT * FROM history WHERE id = ?", (cursor.lastrowid,)
             ).fetchone()
+            conn.commit()
             result = dict(row)
-            result["full_response"] = json.loads(result["full_response"])
+            # Same content as the JSON text just stored; no need to re-parse it.
+            result["full_response"] = full_response
             return result
         finally:
             conn.close()
@@ -557,6 +792,7 @@ class Database:
 
             if search:
                 like = f"%{search}%"
+                self._add_fts_prefilter("history", search, conditions, params)
                 conditions.append(
                     "(summary LIKE ? OR test_type_display LIKE ? OR filename LIKE ?)"
                 )
@@ -840,8 +1076,19 @@ class Database:
         """
         conn = self._get_conn()
         try:
+            # Only the original summary is needed, so SQLite extracts it
+            # rather than shipping and parsing the whole response per row.
+            # json.dumps can write NaN/Infinity, which json_valid rejects;
+            # those responses come back whole and are parsed in Python.
             rows = conn.execute(
-                """SELECT full_response, edited_text FROM history
+                """SELECT CASE WHEN json_valid(full_response) THEN
+                            json_extract(full_response, '$.explanation.overall_summary')
+                          END AS original,
+                          CASE WHEN NOT json_valid(full_response) THEN
+                            full_response
+                          END AS full_response,
+                          edited_text
+                   FROM history
                    WHERE test_type = ? AND edited_text IS NOT NULL
                    ORDER BY updated_at DESC LIMIT ?""",
                 (test_type, limit),
@@ -853,8 +1100,11 @@ class Database:
                     if not row["edited_text"]:
                         continue
 
-                    full_response = json.loads(row["full_response"])
-                    original = full_response.get("explanation", {}).get("overall_summary", "")
+                    if row["full_response"] is not None:
+                        full_response = json.loads(row["full_response"])
+                        original = full_response.get("explanation", {}).get("overall_summary", "")
+                    else:
+                        original = row["original"]
                     edited = row["edited_text"]
 
                     if not original:
@@ -1061,8 +1311,18 @@ class Database:
         """
         conn = self._get_conn()
         try:
+            # Only the measurements array is needed, so SQLite extracts it
+            # rather than shipping and parsing the whole response per row.
+            # Responses json_valid rejects (NaN/Infinity) are parsed in Python.
             rows = conn.execute(
-                """SELECT created_at, full_response FROM history
+                """SELECT created_at,
+                          CASE WHEN json_valid(full_response) THEN
+                            json_extract(full_response, '$.parsed_report.measurements')
+                          END AS measurements,
+                          CASE WHEN NOT json_valid(full_response) THEN
+                            full_response
+                          END AS full_response
+                   FROM history
                    WHERE test_type = ?
                    ORDER BY created_at DESC LIMIT ?""",
                 (test_type, limit),
@@ -1071,9 +1331,14 @@ class Database:
             results: list[dict[str, Any]] = []
             for row in rows:
                 try:
-                    full_response = json.loads(row["full_response"])
-                    parsed_report = full_response.get("parsed_report", {})
-                    measurements = parsed_report.get("measurements", [])
+                    if row["full_response"] is not None:
+                        full_response = json.loads(row["full_response"])
+                        parsed_report = full_response.get("parsed_report", {})
+                        measurements = parsed_report.get("measurements", [])
+                    elif row["measurements"] is not None:
+                        measurements = json.loads(row["measurements"])
+                    else:
+                        continue
 
                     # Extract date portion from ISO timestamp
                     created_at = row["created_at"]
@@ -1339,13 +1604,14 @@ class Database:
         conn = self._get_conn()
         try:
             sid = str(uuid.uuid4())
-            cursor = conn.execute(
+            row = conn.execute(
                 """INSERT INTO templates (name, test_type, tone, structure_instructions, closing_text, sync_id)
-                   VALUES (?, ?, ?, ?, ?, ?)""",
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   RETURNING *""",
                 (name, test_type, tone, structure_instructions, closing_text, sid),
-            )
+            ).fetchone()
             conn.commit()
-            return self.get_template(cursor.lastrowid)  # type: ignore[return-value]
+            return self._normalize_template_row(dict(row))
         finally:
             conn.close()
 
@@ -1479,6 +1745,7 @@ class Database:
 
             if search:
                 like = f"%{search}%"
+                self._add_fts_prefilter("letters", search, conditions, params)
                 conditions.append("(content LIKE ? OR prompt LIKE ?)")
                 params.extend([like, like])
 
@@ -1558,15 +1825,11 @@ class Database:
         try:
             sid = str(uuid.uuid4())
             now = _now()
-            cursor = conn.execute(
-                "INSERT INTO teaching_points (text, test_type, sync_id, updated_at) VALUES (?, ?, ?, ?)",
-                (text, test_type, sid, now),
-            )
-            conn.commit()
             row = conn.execute(
-                "SELECT * FROM teaching_points WHERE id = ?",
-                (cursor.lastrowid,),
+                "INSERT INTO teaching_points (text, test_type, sync_id, updated_at) VALUES (?, ?, ?, ?) RETURNING *",
+                (text, test_type, sid, now),
             ).fetchone()
+            conn.commit()
             return dict(row)
         finally:
             conn.close()
@@ -1918,4 +2181,5 @@ def get_db() -> Database:
     global _db_instance
     if _db_instance is None:
         _db_instance = Database()
+        atexit.register(_db_instance.close_all)
     return _db_instance
@@ -0,0 +1,172 @@
+"""Tests for severity-conditional pattern extraction."""
+
+import asyncio
+import tempfile
+import os
+
+import pytest
+
+from storage.database import Database
+from storage.conditional_pattern_analyzer import (
+    _extract_sentences,
+    analyze_and_store_patterns,
+)
+
+
+@pytest.fixture
+def db():
+    """Create an isolated Database using a temp file."""
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    database = Database(db_path=path)
+    try:
+        yield database
+    finally:
+        database.close_all()
+        os.unlink(path)
+
+
+def _run(coro):
+    """Run an async coroutine synchronously."""
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+# --- Sentence extraction ---
+
+class TestExtractSentences:
+    def test_splits_on_terminators(self):
+        text = "Your heart looks healthy. Is anything bothering you? Call us today please!"
+        assert _extract_sentences(text) == [
+            "Your heart looks healthy.",
+            "Is anything bothering you?",
+            "Call us today please!",
+        ]
+
+    def test_drops_short_and_long_sentences(self):
+        long_sentence = "word " * 50 + "end."
+        text = f"Too short. {long_sentence} This one is just right."
+        assert _extract_sentences(text) == ["This one is just right."]
+
+    def test_length_bounds_are_inclusive(self):
+        fifteen = "abcdefghijklmn."
+        assert len(fifteen) == 15
+        assert _extract_sentences(fifteen + " " + fifteen[:-2] + ".") == [fifteen]
+        two_hundred = "a" * 199 + "."
+        assert _extract_sentences(two_hundred) == [two_hundred]
+        assert _extract_sentences("a" * 200 + ".") == []
+
+    def test_keeps_decimals_and_abbreviation_runs(self):
+        text = "The valve area is 2.5 cm today... We will recheck it soon?! Thanks so much."
+        assert _extract_sentences(text) == [
+            "The valve area is 2.5 cm today...",
+            "We will recheck it soon?!",
+            "Thanks so much.",
+        ]
+
+    def test_any_whitespace_separates(self):
+        text = "First paragraph ends here.\n\nSecond paragraph starts.\tThird sentence is here."
+        assert _extract_sentences(text) == [
+            "First paragraph ends here.",
+            "Second paragraph starts.",
+            "Third sentence is here.",
+        ]
+
+    def test_surrounding_whitespace_and_trailing_text(self):
+        text = "  Leading space sentence.   Unterminated trailing text  "
+        assert _extract_sentences(text) == [
+            "Leading space sentence.",
+            "Unterminated trailing text",
+        ]
+
+    def test_no_split_without_whitespace(self):
+        assert _extract_sentences("Results.Are.Joined.Together") == [
+            "Results.Are.Joined.Together",
+        ]
+
+    def test_empty(self):
+        assert _extract_sentences("") == []
+        assert _extract_sentences("   ") == []
+
+
+# --- Rule selection ---
+
+_LONG_A = "We reviewed all of your results in detail and " + "x" * 40 + " first ending."
+_LONG_B = "We reviewed all of your results in detail and " + "x" * 40 + " second ending."
+
+
+def _seed(db: Database) -> None:
+    """Liked/copied history across severity bands (see TestRuleSelection)."""
+
+    def add(text: str, score: float | None, keep: str | None = "liked",
+            summary_only: bool = False, test_type: str = "echo") -> None:
+        record = db.save_history(
+            test_type=test_type,
+            test_type_display="Echo",
+            summary="s",
+            full_response={"explanation": {"overall_summary": text}},
+            severity_score=score,
+        )
+        if not summary_only:
+            db.save_edited_text(record["id"], text)
+        if keep == "liked":
+            db.update_history_liked(record["id"], True)
+        elif keep == "copied":
+            db.mark_copied(record["id"])
+
+    # Normal band
+    add("Please continue your current medications. Let me know if you have any questions. "
+        "Your ejection fraction is normal today. " + _LONG_A, 0.1)
+    add("please continue your current medications. Let me know if you have any questions. "
+        "Your ejection fraction is normal today. " + _LONG_B, None, keep="copied")
+    add("PLEASE CONTINUE YOUR CURRENT MEDICATIONS. Let me know if you have any questions. "
+        "Your ejection fraction is normal today. " + _LONG_A + " Said in a single kept report.",
+        0.15, summary_only=True)
+    add("Said in a single kept report. Please continue your current medications.", 0.0, keep=None)
+    # Mild band: too few sentences to produce rules
+    add("Please continue your current medications. Mild changes were noted.", 0.3)
+    # Severe band
+    for _ in range(3):
+        add("Please call the office to schedule a visit. We should talk soon about this.", 0.9)
+    add("Let me know if you have any questions.", 0.95)
+    # Another test type is ignored
+    for _ in range(3):
+        add("Please continue your current medications.", 0.1, test_type="lipids")
+
+
+def _rules(db: Database) -> dict[str, list[tuple[str, str, int]]]:
+    return {
+        band: sorted(
+            (r["phrase"], r["pattern_type"], r["count"])
+            for r in db.get_conditional_rules("echo", band, min_count=1)
+        )
+        for band in ("normal", "mild", "moderate", "severe")
+    }
+
+
+class TestRuleSelection:
+    def test_rules_per_band(self, db: Database):
+        _seed(db)
+        _run(analyze_and_store_patterns(db, "echo"))
+        assert _rules(db) == {
+            # "Please continue ..." also appears in the mild band, and
+            # "Let me know ..." in the severe band, so neither is a rule
+            "normal": [(_LONG_A, "general", 1)],
+            "mild": [],
+            "moderate": [],
+            "severe": [
+                ("Please call the office to schedule a visit.", "escalation", 1),
+                ("We should talk soon about this.", "general", 1),
+            ],
+        }
+
+    def test_rerun_increments_counts(self, db: Database):
+        _seed(db)
+        _run(analyze_and_store_patterns(db, "echo"))
+        _run(analyze_and_store_patterns(db, "echo"))
+        rules = _rules(db)
+        assert [count for _, _, count in rules["normal"]] == [2]
+        assert [count for _, _, count in rules["severe"]] == [2, 2]
+
+    def test_no_rules_without_kept_history(self, db: Database):
+        _run(analyze_and_store_patterns(db, "echo"))
+        assert _rules(db) == {"normal": [], "mild": [], "moderate": [], "severe": []}
@@ -553,3 +553,53 @@ class TestResponseParser:
         result, issues = parse_and_validate_response(tool_result, report)
         warning_messages = [i.message for i in issues]
         assert not any("not explained" in m for m in warning_messages)
+
+    def test_revalidation_reuses_abbreviation_index(self):
+        """Retries validate against the same report; the index is built once."""
+        report = _make_parsed_report()
+        tool_result = {
+            "overall_summary": "Summary.",
+            "measurements": [
+                {
+                    "abbreviation": "LVEF",
+                    "value": 60.0,
+                    "unit": "%",
+                    "status": "normal",
+                    "plain_language": "Normal.",
+                },
+            ],
+        }
+
+        parse_and_validate_response(tool_result, report)
+        index = report.abbreviation_index
+        result, _ = parse_and_validate_response(tool_result, report)
+        assert report.abbreviation_index is index
+        assert set(index) == {"LVEF", "LVIDd"}
+        assert result.measurements[0].value == 57.5
+
+    def test_humanization_off_leaves_text_untouched(self):
+        report = _make_parsed_report()
+        tool_result = {
+            "overall_summary": "Your LVEF is normal. It is not a concern.",
+            "measurements": [
+                {
+                    "abbreviation": "LVEF",
+                    "value": 57.5,
+                    "unit": "%",
+                    "status": "normal",
+                    "plain_language": "",
+                },
+            ],
+        }
+
+        result, _ = parse_and_validate_response(
+            tool_result, report, humanization_level=0,
+        )
+        assert result.overall_summary == "Your LVEF is normal. It is not a concern."
+        assert result.measurements[0].plain_language == ""
+
+        result, _ = parse_and_validate_response(tool_result, report)
+        assert result.overall_summary.startswith(
+            "Your left ventricular ejection fraction (LVEF)"
+        )
+        assert "It isn't" in result.overall_summary
@@ -1,8 +1,9 @@
 """Tests for the PHI scrubber module."""
 
+import asyncio
 import re
 
-from phi.scrubber import scrub_phi, _extract_patient_names
+from phi.scrubber import scrub_phi, scrub_phi_async, _extract_patient_names
 
 
 class TestPHIScrubber:
@@ -361,6 +362,13 @@ class TestDeviceSerial:
         result = scrub_phi(text)
         assert "12345-ABCDE" not in result.scrubbed_text
 
+    def test_label_with_case_folded_letter(self):
+        # (?i) matches the long s against "s"; the label pre-check must not
+        # skip the pattern because "serial" is not a literal substring.
+        text = "\u017ferial: ABC-123456"
+        result = scrub_phi(text)
+        assert "ABC-123456" not in result.scrubbed_text
+
 
 class TestIPAddress:
     """Tests for IP address scrubbing."""
@@ -375,3 +383,14 @@ class TestIPAddress:
         text = "Login from 203.0.113.45"
         result = scrub_phi(text)
         assert "203.0.113.45" not in result.scrubbed_text
+
+
+class TestScrubPhiAsync:
+    """scrub_phi_async runs scrub_phi off the event loop."""
+
+    def test_matches_sync_result(self):
+        text = "Patient: John Doe\nSSN: 123-45-6789\nRead by Jane Smith, MD"
+        result = asyncio.get_event_loop().run_until_complete(
+            scrub_phi_async(text, ["Jane Smith"])
+        )
+        assert result == scrub_phi(text, provider_names=["Jane Smith"])
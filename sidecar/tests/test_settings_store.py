@@ -17,9 +17,11 @@ def mock_db():
     """Create an isolated Database using a temp file."""
     fd, path = tempfile.mkstemp(suffix=".db")
     os.close(fd)
+    database = Database(db_path=path)
     try:
-        yield Database(db_path=path)
+        yield database
     finally:
+        database.close_all()
         os.unlink(path)
 
 
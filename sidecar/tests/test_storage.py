@@ -2,10 +2,11 @@
 
 import tempfile
 import os
+import sqlite3
 
 import pytest
 
-from storage.database import Database
+from storage.database import _SCHEMA_VERSION, Database
 
 
 @pytest.fixture
@@ -13,9 +14,11 @@ def db():
     """Create an isolated Database using a temp file."""
     fd, path = tempfile.mkstemp(suffix=".db")
     os.close(fd)
+    database = Database(db_path=path)
     try:
-        yield Database(db_path=path)
+        yield database
     finally:
+        database.close_all()
         os.unlink(path)
 
 
@@ -40,6 +43,11 @@ class TestSettings:
         result = db.get_all_settings()
         assert result == {"a": "1", "b": "2"}
 
+    def test_set_settings_batch(self, db: Database):
+        db.set_setting("a", "old")
+        db.set_settings({"a": "1", "b": "2"})
+        assert db.get_all_settings() == {"a": "1", "b": "2"}
+
     def test_delete_setting(self, db: Database):
         db.set_setting("key", "val")
         db.delete_setting("key")
@@ -104,6 +112,23 @@ class TestHistory:
         items, total = db.list_history(search="echo_report")
         assert total == 1
 
+    def test_search_is_case_insensitive(self, db: Database):
+        self._make_record(db, summary="Mild Mitral Regurgitation")
+        items, total = db.list_history(search="mitral regurg")
+        assert total == 1
+
+    def test_search_short_and_wildcard_terms(self, db: Database):
+        self._make_record(db, summary="EF 55%")
+        self._make_record(db, summary="Normal")
+        assert db.list_history(search="EF")[1] == 1
+        assert db.list_history(search="55%")[1] == 1
+        assert db.list_history(search="N_rmal")[1] == 1
+
+    def test_search_skips_deleted_records(self, db: Database):
+        record_id = self._make_record(db, summary="Heart is normal")
+        db.delete_history(record_id)
+        assert db.list_history(search="Heart")[1] == 0
+
     def test_hard_delete(self, db: Database):
         record_id = self._make_record(db)
         assert db.delete_history(record_id) is True
@@ -186,6 +211,180 @@ class TestHistory:
         assert total == 1
         assert items[0]["id"] == id2
 
+    def test_prior_measurements(self, db: Database):
+        self._make_record(db, full_response={"parsed_report": {"measurements": [
+            {"abbreviation": "EF", "value": 55, "unit": "%", "status": "normal"},
+            {"abbreviation": "LVIDd", "value": None},
+        ]}})
+        prior = db.get_prior_measurements("echo")
+        assert len(prior) == 1
+        assert prior[0]["measurements"] == [
+            {"abbreviation": "EF", "value": 55, "unit": "%", "status": "normal"},
+        ]
+
+    def test_prior_measurements_with_nan(self, db: Database):
+        # json.dumps writes NaN, which SQLite's JSON functions reject
+        self._make_record(db, full_response={"parsed_report": {"measurements": [
+            {"abbreviation": "EF", "value": 55, "unit": "%", "status": "normal"},
+            {"abbreviation": "TAPSE", "value": float("nan"), "unit": "mm"},
+        ]}})
+        prior = db.get_prior_measurements("echo")
+        assert len(prior) == 1
+        abbreviations = [m["abbreviation"] for m in prior[0]["measurements"]]
+        assert abbreviations == ["EF", "TAPSE"]
+
+    def test_recent_edits_with_nan(self, db: Database):
+        record_id = self._make_record(db, full_response={
+            "explanation": {"overall_summary": "First part.\n\nSecond part."},
+            "severity_score": float("nan"),
+        })
+        db.save_edited_text(record_id, "Shorter.")
+        edits = db.get_recent_edits("echo")
+        assert len(edits) == 1
+        assert edits[0]["shorter"] is True
+        assert edits[0]["paragraph_change"] == -1
+
+
+# --- Letters ---
+
+class TestLetters:
+    def test_search_content_and_prompt(self, db: Database):
+        db.save_letter(prompt="Explain echo", content="Your heart looks strong.")
+        db.save_letter(prompt="Lipids", content="Cholesterol is slightly high.")
+        assert db.list_letters(search="HEART LOOKS")[1] == 1
+        assert db.list_letters(search="lipid")[1] == 1
+        assert db.list_letters(search="ec")[1] == 1
+
+    def test_search_follows_updates(self, db: Database):
+        letter_id = db.save_letter(prompt="p", content="Old wording here")
+        db.update_letter(letter_id, "New wording here")
+        assert db.list_letters(search="Old wording")[1] == 0
+        assert db.list_letters(search="New wording")[1] == 1
+
+
+# --- Migrations ---
+
+_LEGACY_SCHEMA = """
+CREATE TABLE history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    test_type TEXT NOT NULL,
+    test_type_display TEXT NOT NULL,
+    filename TEXT,
+    summary TEXT NOT NULL,
+    full_response TEXT NOT NULL
+);
+CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+INSERT INTO history (created_at, test_type, test_type_display, summary, full_response)
+VALUES ('2024-01-01T00:00:00Z', 'echo', 'Echocardiogram', 'Heart is normal',
+        '{"severity_score": 0.4}');
+INSERT INTO settings VALUES ('theme', 'dark');
+"""
+
+
+class TestMigrations:
+    @pytest.fixture
+    def legacy_db(self):
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        conn = sqlite3.connect(path)
+        conn.executescript(_LEGACY_SCHEMA)
+        conn.close()
+        database = Database(db_path=path)
+        try:
+            yield database
+        finally:
+            database.close_all()
+            os.unlink(path)
+
+    def test_columns_added_and_backfilled(self, legacy_db: Database):
+        record = legacy_db.get_history(1)
+        assert record["liked"] == 0
+        assert record["sync_id"]
+        assert record["updated_at"] == "2024-01-01T00:00:00Z"
+        assert record["severity_score"] == 0.4
+
+    def test_existing_data_kept(self, legacy_db: Database):
+        assert legacy_db.get_setting("theme") == "dark"
+        assert legacy_db.list_history(search="heart")[1] == 1
+
+    def test_reopen_is_idempotent(self, legacy_db: Database):
+        sync_id = legacy_db.get_history(1)["sync_id"]
+        reopened = Database(db_path=legacy_db._db_path)
+        try:
+            assert reopened.get_history(1)["sync_id"] == sync_id
+            _, total = reopened.list_templates()
+            assert total == 1
+        finally:
+            reopened.close_all()
+
+    def test_schema_version_recorded(self, legacy_db: Database):
+        conn = legacy_db._get_conn()
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+        assert version == _SCHEMA_VERSION
+
+    def test_duplicate_sync_ids_keep_oldest(self, db: Database):
+        first = db.save_history("echo", "Echo", "first", {})
+        db.save_history("echo", "Echo", "other", {})
+        conn = db._get_conn()
+        try:
+            conn.execute("DROP INDEX idx_history_sync_id")
+            conn.execute(
+                """INSERT INTO history (test_type, test_type_display, summary, full_response, sync_id)
+                   VALUES ('echo', 'Echo', 'copy', '{}', ?)""",
+                (first["sync_id"],),
+            )
+            conn.execute("PRAGMA user_version = 0")
+            conn.commit()
+        finally:
+            conn.close()
+        reopened = Database(db_path=db._db_path)
+        try:
+            items, total = reopened.list_history()
+            assert total == 2
+            assert {item["summary"] for item in items} == {"first", "other"}
+        finally:
+            reopened.close_all()
+
+    def test_seeded_template_has_sync_id(self, db: Database):
+        templates, _ = db.list_templates()
+        assert templates[0]["is_builtin"]
+        assert templates[0]["sync_id"]
+
+
+# --- Connection pool ---
+
+class TestConnectionPool:
+    def test_closed_connection_is_reused(self, db: Database):
+        conn = db._get_conn()
+        conn.close()
+        assert db._get_conn() is conn
+
+    def test_nested_connections_are_distinct(self, db: Database):
+        outer = db._get_conn()
+        inner = db._get_conn()
+        assert inner is not outer
+        inner.close()
+        outer.close()
+
+    def test_close_discards_uncommitted_work(self, db: Database):
+        conn = db._get_conn()
+        conn.execute(
+            "INSERT INTO settings (key, value, updated_at) VALUES ('k', 'v', '')"
+        )
+        conn.close()
+        assert db.get_setting("k") is None
+
+    def test_close_all_closes_idle_connections(self, db: Database):
+        conn = db._get_conn()
+        conn.close()
+        db.close_all()
+        assert db._get_conn() is not conn
+        assert db.get_setting("missing") is None
+
 
 # --- Templates ---
 